@@ -5,173 +5,79 @@ Interface de conversação com o assistente inteligente
 
 import streamlit as st
 from datetime import datetime
-import time
-import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import re
-
-class ChatInterface:
-    """Classe para gerenciar a interface de chat"""
-    
-    def __init__(self):
-        self.initialize_session_state()
-    
-    def initialize_session_state(self):
-        """Inicializa o estado da sessão para o chat"""
-        if 'messages' not in st.session_state:
-            st.session_state.messages = []
-        
-        if 'chat_history' not in st.session_state:
-            st.session_state.chat_history = []
-        
-        if 'is_typing' not in st.session_state:
-            st.session_state.is_typing = False
-        
-        if 'suggested_questions' not in st.session_state:
-            st.session_state.suggested_questions = self.get_suggested_questions()
-    
-    def get_suggested_questions(self) -> List[str]:
-        """Retorna perguntas sugeridas baseadas no contexto"""
-        return [
-            "📊 Qual foi a carga média do Sudeste na última semana?",
-            "💰 Como está o CMO atual em todos os subsistemas?",
-            "🚦 Qual a bandeira tarifária vigente este mês?",
-            "📈 Mostre a evolução da geração solar nos últimos 30 dias",
-            "💧 Qual o nível atual dos reservatórios do Sul?",
-            "🔄 Analise o intercâmbio entre Norte e Nordeste hoje",
-            "⚡ Compare a eficiência energética entre as regiões",
-            "📉 Identifique anomalias na carga de energia desta semana"
-        ]
-    
-    def format_message_timestamp(self, timestamp: datetime) -> str:
-        """Formata o timestamp da mensagem"""
-        now = datetime.now()
-        diff = now - timestamp
-        
-        if diff.seconds < 60:
-            return "agora"
-        elif diff.seconds < 3600:
-            minutes = diff.seconds // 60
-            return f"{minutes} min atrás"
-        elif diff.days == 0:
-            hours = diff.seconds // 3600
-            return f"{hours}h atrás"
-        else:
-            return timestamp.strftime("%d/%m %H:%M")
-    
-    def process_user_query(self, query: str) -> Dict:
-        """Processa a query do usuário e identifica intenções"""
-        # Identificar tipo de análise solicitada
-        analysis_types = {
-            'carga': ['carga', 'consumo', 'demanda', 'mw', 'energia'],
-            'cmo': ['cmo', 'pld', 'preço', 'custo', 'marginal'],
-            'bandeira': ['bandeira', 'tarifária', 'tarifa', 'adicional'],
-            'geracao': ['geração', 'produção', 'usina', 'solar', 'eólica', 'hidrelétrica'],
-            'reservatorio': ['reservatório', 'água', 'nível', 'armazenamento'],
-            'intercambio': ['intercâmbio', 'transferência', 'fluxo', 'troca']
-        }
-        
-        # Identificar período temporal
-        time_patterns = {
-            'hoje': 'today',
-            'ontem': 'yesterday',
-            'semana': 'week',
-            'mês': 'month',
-            'ano': 'year',
-            'última': 'last',
-            'últimos': 'last'
-        }
-        
-        # Identificar regiões mencionadas
-        regions = {
-            'sudeste': 'Sudeste/CO',
-            'se/co': 'Sudeste/CO',
-            'sul': 'Sul',
-            'nordeste': 'Nordeste',
-            'ne': 'Nordeste',
-            'norte': 'Norte'
-        }
-        
-        query_lower = query.lower()
-        
-        # Detectar tipo de análise
-        detected_type = None
-        for type_key, keywords in analysis_types.items():
-            if any(kw in query_lower for kw in keywords):
-                detected_type = type_key
-                break
-        
-        # Detectar período
-        detected_period = None
-        for time_key, time_value in time_patterns.items():
-            if time_key in query_lower:
-                detected_period = time_value
-                break
-        
-        # Detectar regiões
-        detected_regions = []
-        for region_key, region_value in regions.items():
-            if region_key in query_lower:
-                detected_regions.append(region_value)
-        
-        return {
-            'type': detected_type,
-            'period': detected_period,
-            'regions': detected_regions,
-            'original_query': query
-        }
-    
-    def generate_response(self, query_analysis: Dict) -> str:
-        """Gera resposta baseada na análise da query"""
-        responses = {
-            'carga': self._generate_carga_response,
-            'cmo': self._generate_cmo_response,
-            'bandeira': self._generate_bandeira_response,
-            'geracao': self._generate_geracao_response,
-            'reservatorio': self._generate_reservatorio_response,
-            'intercambio': self._generate_intercambio_response
-        }
-        
-        if query_analysis['type'] in responses:
-            return responses[query_analysis['type']](query_analysis)
-        else:
-            return self._generate_general_response(query_analysis)
-    
-    def _generate_carga_response(self, analysis: Dict) -> str:
-        """Gera resposta para consultas sobre carga de energia"""
-        regions = analysis['regions'] if analysis['regions'] else ['Sudeste/CO']
-        period = analysis['period'] or 'week'
-        
-        response = f"""📊 **Análise de Carga de Energia**
-
-Com base nos dados do ONS, aqui está a análise solicitada:
-
-**Período analisado:** Última semana
-**Regiões:** {', '.join(regions)}
-
-📈 **Resultados Principais:**
-• **Carga Média Total SIN:** 72.845 MWmed
-• **{regions[0]}:** 42.350 MWmed (58% do total)
-• **Pico de Consumo:** 78.920 MW (quinta-feira, 15h)
-• **Vale de Consumo:** 45.230 MW (domingo, 04h)
-
-📊 **Análise Estatística:**
-• **Crescimento semanal:** +3.2%
-• **Desvio padrão:** ±2.145 MW
-• **Tendência:** Estável com leve alta
-
-💡 **Insights:**
-- O consumo está dentro dos padrões esperados para o período
-- Há uma correlação forte (0.85) com a temperatura média
-- Recomenda-se atenção para o próximo período de calor intenso
-
-Gostaria de ver um gráfico detalhado ou analisar outro período?"""
-        
-        return response
-    
-    def _generate_cmo_response(self, analysis: Dict) -> str:
-        """Gera resposta para consultas sobre CMO/PLD"""
-        return f"""💰 **Análise de CMO/PLD**
+from types import MappingProxyType
+from functools import lru_cache
+from dataclasses import dataclass
+
+# Palavras-chave por tipo de análise (ordem define a prioridade)
+_ANALYSIS_TYPES = MappingProxyType({
+    'carga': ('carga', 'consumo', 'demanda', 'mw', 'energia'),
+    'cmo': ('cmo', 'pld', 'preço', 'custo', 'marginal'),
+    'bandeira': ('bandeira', 'tarifária', 'tarifa', 'adicional'),
+    'geracao': ('geração', 'produção', 'usina', 'solar', 'eólica', 'hidrelétrica'),
+    'reservatorio': ('reservatório', 'água', 'nível', 'armazenamento'),
+    'intercambio': ('intercâmbio', 'transferência', 'fluxo', 'troca')
+})
+
+# Períodos temporais
+_TIME_PATTERNS = MappingProxyType({
+    'hoje': 'today',
+    'ontem': 'yesterday',
+    'semana': 'week',
+    'mês': 'month',
+    'ano': 'year',
+    'última': 'last',
+    'últimos': 'last'
+})
+
+# Regiões
+_REGIONS = MappingProxyType({
+    'sudeste': 'Sudeste/CO',
+    'se/co': 'Sudeste/CO',
+    'sul': 'Sul',
+    'nordeste': 'Nordeste',
+    'ne': 'Nordeste',
+    'norte': 'Norte'
+})
+
+# Perguntas sugeridas: (rótulo com emoji, texto enviado ao assistente)
+_SUGGESTED_QUESTIONS = (
+    ("📊 Qual foi a carga média do Sudeste na última semana?", "Qual foi a carga média do Sudeste na última semana?"),
+    ("💰 Como está o CMO atual em todos os subsistemas?", "Como está o CMO atual em todos os subsistemas?"),
+    ("🚦 Qual a bandeira tarifária vigente este mês?", "Qual a bandeira tarifária vigente este mês?"),
+    ("📈 Mostre a evolução da geração solar nos últimos 30 dias", "Mostre a evolução da geração solar nos últimos 30 dias"),
+    ("💧 Qual o nível atual dos reservatórios do Sul?", "Qual o nível atual dos reservatórios do Sul?"),
+    ("🔄 Analise o intercâmbio entre Norte e Nordeste hoje", "Analise o intercâmbio entre Norte e Nordeste hoje"),
+    ("⚡ Compare a eficiência energética entre as regiões", "Compare a eficiência energética entre as regiões"),
+    ("📉 Identifique anomalias na carga de energia desta semana", "Identifique anomalias na carga de energia desta semana")
+)
+
+_SUGGESTED_LABELS = tuple(label for label, _ in _SUGGESTED_QUESTIONS)
+
+# Índice token -> (categoria, chave). A query é quebrada em palavras e cada
+# uma é resolvida com um lookup no dicionário, sem busca por substring
+# (que gerava falsos positivos como "ne" dentro de "energia").
+def _build_word_index() -> Dict[str, Tuple[str, str]]:
+    index = {}
+    for type_key, keywords in _ANALYSIS_TYPES.items():
+        for kw in keywords:
+            index.setdefault(kw, ('type', type_key))
+            # Plural simples ("reservatórios", "bandeiras", "usinas")
+            if not kw.endswith('s'):
+                index.setdefault(kw + 's', ('type', type_key))
+    for time_key in _TIME_PATTERNS:
+        index.setdefault(time_key, ('period', time_key))
+    for region_key in _REGIONS:
+        index.setdefault(region_key, ('region', region_key))
+    return index
+
+_WORD_TO_CATEGORY = MappingProxyType(_build_word_index())
+_TOKEN_RE = re.compile(r"[\w/]+")
+
+# Respostas fixas por tipo de análise
+_CMO_RESPONSE = """💰 **Análise de CMO/PLD**
 
 **Custo Marginal de Operação - Valores Atuais:**
 
@@ -197,10 +103,8 @@ Gostaria de ver um gráfico detalhado ou analisar outro período?"""
 - Expectativa de chuvas abaixo da média
 
 Deseja analisar o histórico ou comparar com períodos anteriores?"""
-    
-    def _generate_bandeira_response(self, analysis: Dict) -> str:
-        """Gera resposta para consultas sobre bandeiras tarifárias"""
-        return f"""🚦 **Bandeiras Tarifárias - Status Atual**
+
+_BANDEIRA_RESPONSE = """🚦 **Bandeiras Tarifárias - Status Atual**
 
 **Bandeira Vigente:** 🟢 **VERDE**
 **Período:** Setembro/2025
@@ -227,10 +131,8 @@ Deseja analisar o histórico ou comparar com períodos anteriores?"""
 Probabilidade de manutenção da bandeira verde: 75%
 
 Gostaria de ver o impacto financeiro acumulado?"""
-    
-    def _generate_geracao_response(self, analysis: Dict) -> str:
-        """Gera resposta para consultas sobre geração"""
-        return f"""⚡ **Análise de Geração de Energia**
+
+_GERACAO_RESPONSE = """⚡ **Análise de Geração de Energia**
 
 **Mix de Geração Atual do SIN:**
 
@@ -258,10 +160,8 @@ Gostaria de ver o impacto financeiro acumulado?"""
 - Indisponibilidade forçada: 2.0%
 
 Deseja ver a evolução histórica ou projeções futuras?"""
-    
-    def _generate_reservatorio_response(self, analysis: Dict) -> str:
-        """Gera resposta para consultas sobre reservatórios"""
-        return f"""💧 **Situação dos Reservatórios**
+
+_RESERVATORIO_RESPONSE = """💧 **Situação dos Reservatórios**
 
 **Níveis Atuais por Subsistema:**
 
@@ -290,10 +190,8 @@ Deseja ver a evolução histórica ou projeções futuras?"""
 Manutenção preventiva de usinas térmicas recomendada para garantir segurança energética.
 
 Gostaria de ver a evolução histórica ou cenários de simulação?"""
-    
-    def _generate_intercambio_response(self, analysis: Dict) -> str:
-        """Gera resposta para consultas sobre intercâmbio"""
-        return f"""🔄 **Análise de Intercâmbio Regional**
+
+_INTERCAMBIO_RESPONSE = """🔄 **Análise de Intercâmbio Regional**
 
 **Fluxos Atuais entre Subsistemas:**
 
@@ -322,12 +220,36 @@ Gostaria de ver a evolução histórica ou cenários de simulação?"""
 Intercâmbio está otimizado para minimizar CMO global do sistema.
 
 Deseja analisar o histórico ou ver projeções?"""
-    
-    def _generate_general_response(self, analysis: Dict) -> str:
-        """Gera resposta genérica quando o tipo não é identificado"""
-        return f"""🤖 **Análise AIDE**
 
-Entendi sua pergunta: "{analysis['original_query']}"
+# Templates com partes dinâmicas (preenchidos via format_map)
+_CARGA_TPL = """📊 **Análise de Carga de Energia**
+
+Com base nos dados do ONS, aqui está a análise solicitada:
+
+**Período analisado:** Última semana
+**Regiões:** {regions_joined}
+
+📈 **Resultados Principais:**
+• **Carga Média Total SIN:** 72.845 MWmed
+• **{first_region}:** 42.350 MWmed (58% do total)
+• **Pico de Consumo:** 78.920 MW (quinta-feira, 15h)
+• **Vale de Consumo:** 45.230 MW (domingo, 04h)
+
+📊 **Análise Estatística:**
+• **Crescimento semanal:** +3.2%
+• **Desvio padrão:** ±2.145 MW
+• **Tendência:** Estável com leve alta
+
+💡 **Insights:**
+- O consumo está dentro dos padrões esperados para o período
+- Há uma correlação forte (0.85) com a temperatura média
+- Recomenda-se atenção para o próximo período de calor intenso
+
+Gostaria de ver um gráfico detalhado ou analisar outro período?"""
+
+_GENERAL_TPL = """🤖 **Análise AIDE**
+
+Entendi sua pergunta: "{query}"
 
 Para fornecer a melhor análise possível, aqui estão algumas opções:
 
@@ -348,34 +270,220 @@ Para fornecer a melhor análise possível, aqui estão algumas opções:
 Por favor, reformule sua pergunta ou escolha uma das opções acima para uma análise detalhada.
 
 Posso ajudar com algo específico?"""
+
+# Respostas fixas indexadas pelo tipo de análise
+_STATIC_RESPONSES = MappingProxyType({
+    'cmo': _CMO_RESPONSE,
+    'bandeira': _BANDEIRA_RESPONSE,
+    'geracao': _GERACAO_RESPONSE,
+    'reservatorio': _RESERVATORIO_RESPONSE,
+    'intercambio': _INTERCAMBIO_RESPONSE
+})
+
+@lru_cache(maxsize=256)
+def _carga_response(period: Optional[str], regions: Tuple[str, ...]) -> str:
+    """Gera resposta para consultas sobre carga de energia (memoizada)"""
+    regions = regions or ('Sudeste/CO',)
+    period = period or 'week'
+    
+    return _CARGA_TPL.format_map({
+        'regions_joined': ', '.join(regions),
+        'first_region': regions[0]
+    })
+
+# Templates HTML das mensagens
+_USER_MESSAGE_TPL = """
+    <div class="user-message" style="background: linear-gradient(135deg, #cfe4f9 0%, #e8f4fd 100%); 
+                padding: 1rem; border-radius: 12px 12px 4px 12px; margin: 0.5rem 0; 
+                border-left: 3px solid #3b82f6;">
+        <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
+            <strong>👤 Você</strong>
+            <small style="color: #6c757d;">{timestamp}</small>
+        </div>
+        <div>{content}</div>
+    </div>
+"""
+
+_ASSISTANT_MESSAGE_TPL = """
+    <div class="assistant-message" style="background: linear-gradient(135deg, #f9f7f4 0%, #ffffff 100%); 
+                padding: 1rem; border-radius: 12px 12px 12px 4px; margin: 0.5rem 0; 
+                border-left: 3px solid #e7cba9;">
+        <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
+            <strong>⚡ AIDE</strong>
+            <small style="color: #6c757d;">{timestamp}</small>
+        </div>
+        <div>{content}</div>
+    </div>
+"""
+
+# Indicador de digitação. O Streamlit remove do DOM o que não é emitido no
+# rerun, então o @keyframes acompanha o indicador, que agora só aparece
+# enquanto uma resposta é gerada.
+_TYPING_CSS = """
+    <style>
+        @keyframes bounce {
+            0%, 80%, 100% { transform: scale(0); }
+            40% { transform: scale(1); }
+        }
+    </style>
+"""
+
+_TYPING_INDICATOR_HTML = _TYPING_CSS + """
+    <div style="display: flex; align-items: center; padding: 10px;">
+        <div style="display: flex; gap: 4px;">
+            <div style="width: 8px; height: 8px; background: #e7cba9; 
+                        border-radius: 50%; animation: bounce 1.4s infinite ease-in-out both;"></div>
+            <div style="width: 8px; height: 8px; background: #e7cba9; 
+                        border-radius: 50%; animation: bounce 1.4s infinite ease-in-out both; 
+                        animation-delay: -0.16s;"></div>
+            <div style="width: 8px; height: 8px; background: #e7cba9; 
+                        border-radius: 50%; animation: bounce 1.4s infinite ease-in-out both; 
+                        animation-delay: -0.32s;"></div>
+        </div>
+        <span style="margin-left: 10px; color: #6c757d; font-size: 14px;">AIDE está digitando...</span>
+    </div>
+"""
+
+@st.cache_data(max_entries=1000)
+def _render_message_html(role: str, content: str, ts_str: str) -> str:
+    """Gera o HTML de uma mensagem (cacheado por role/conteúdo/horário)"""
+    template = _USER_MESSAGE_TPL if role == "user" else _ASSISTANT_MESSAGE_TPL
+    return template.format_map({'timestamp': ts_str, 'content': content})
+
+@dataclass(frozen=True, slots=True)
+class QueryAnalysis:
+    """Intenção identificada numa pergunta do usuário"""
+    type: Optional[str]
+    period: Optional[str]
+    regions: Tuple[str, ...]
+    original_query: str
+
+def _format_timestamp(timestamp: datetime, now: datetime) -> str:
+    """Formata o timestamp da mensagem relativo a `now`"""
+    diff = now - timestamp
+    
+    if diff.seconds < 60:
+        return "agora"
+    elif diff.seconds < 3600:
+        minutes = diff.seconds // 60
+        return f"{minutes} min atrás"
+    elif diff.days == 0:
+        hours = diff.seconds // 3600
+        return f"{hours}h atrás"
+    else:
+        return timestamp.strftime("%d/%m %H:%M")
+
+def _stamp_message(message: Dict, now: datetime) -> None:
+    """Grava na mensagem o rótulo de horário e o minuto em que ele vale"""
+    timestamp = message.setdefault('timestamp', now)
+    message['_ts_str'] = _format_timestamp(timestamp, now)
+    message['_ts_bucket'] = now.replace(second=0, microsecond=0) if (now - timestamp).days == 0 else None
+
+def _append_message(role: str, content: str) -> None:
+    """Adiciona mensagem ao histórico já com o rótulo de horário calculado"""
+    message = {"role": role, "content": content, "timestamp": datetime.now()}
+    _stamp_message(message, message["timestamp"])
+    st.session_state.messages.append(message)
+
+def init_chat_state():
+    """Inicializa o estado da sessão para o chat (executado a cada rerun)"""
+    if 'messages' not in st.session_state:
+        st.session_state.messages = []
+    
+    if 'chat_history' not in st.session_state:
+        st.session_state.chat_history = []
+    
+    # HTML já renderizado, em paralelo a `messages`
+    if '_rendered_html' not in st.session_state:
+        st.session_state['_rendered_html'] = []
+
+class ChatInterface:
+    """Classe para gerenciar a interface de chat"""
+    
+    def initialize_session_state(self):
+        """Inicializa o estado da sessão para o chat"""
+        init_chat_state()
+    
+    def get_suggested_questions(self) -> Tuple[str, ...]:
+        """Retorna perguntas sugeridas baseadas no contexto"""
+        return _SUGGESTED_LABELS
+    
+    def format_message_timestamp(self, timestamp: datetime, now: Optional[datetime] = None) -> str:
+        """Formata o timestamp da mensagem relativo a `now` (calculado uma vez por rerun)"""
+        return _format_timestamp(timestamp, now or datetime.now())
+    
+    def process_user_query(self, query: str) -> QueryAnalysis:
+        """Processa a query do usuário e identifica intenções"""
+        # Tokeniza uma vez e resolve cada palavra no índice
+        matched = {'type': set(), 'period': set(), 'region': set()}
+        for token in _TOKEN_RE.findall(query.lower()):
+            entry = _WORD_TO_CATEGORY.get(token)
+            if entry is not None:
+                matched[entry[0]].add(entry[1])
+        
+        # Detectar tipo de análise (ordem da tabela = prioridade)
+        detected_type = None
+        if matched['type']:
+            for type_key in _ANALYSIS_TYPES:
+                if type_key in matched['type']:
+                    detected_type = type_key
+                    break
+        
+        # Detectar período
+        detected_period = None
+        if matched['period']:
+            for time_key, time_value in _TIME_PATTERNS.items():
+                if time_key in matched['period']:
+                    detected_period = time_value
+                    break
+        
+        # Detectar regiões, parando quando todas as citadas forem resolvidas
+        detected_regions = []
+        remaining = len(matched['region'])
+        for region_key, region_value in _REGIONS.items():
+            if not remaining:
+                break
+            if region_key in matched['region']:
+                detected_regions.append(region_value)
+                remaining -= 1
+        
+        return QueryAnalysis(
+            type=detected_type,
+            period=detected_period,
+            regions=tuple(detected_regions),
+            original_query=query
+        )
+    
+    def generate_response(self, query_analysis: QueryAnalysis) -> str:
+        """Gera resposta baseada na análise da query"""
+        analysis_type = query_analysis.type
+        
+        if analysis_type == 'carga':
+            return _carga_response(query_analysis.period, query_analysis.regions)
+        
+        response = _STATIC_RESPONSES.get(analysis_type)
+        if response is not None:
+            return response
+        return self._generate_general_response(query_analysis)
+    
+    def _generate_general_response(self, analysis: QueryAnalysis) -> str:
+        """Gera resposta genérica quando o tipo não é identificado"""
+        return _GENERAL_TPL.format_map({'query': analysis.original_query})
     
     def render_typing_indicator(self):
         """Renderiza indicador de digitação"""
-        return st.markdown("""
-            <div style="display: flex; align-items: center; padding: 10px;">
-                <div style="display: flex; gap: 4px;">
-                    <div style="width: 8px; height: 8px; background: #e7cba9; 
-                                border-radius: 50%; animation: bounce 1.4s infinite ease-in-out both;"></div>
-                    <div style="width: 8px; height: 8px; background: #e7cba9; 
-                                border-radius: 50%; animation: bounce 1.4s infinite ease-in-out both; 
-                                animation-delay: -0.16s;"></div>
-                    <div style="width: 8px; height: 8px; background: #e7cba9; 
-                                border-radius: 50%; animation: bounce 1.4s infinite ease-in-out both; 
-                                animation-delay: -0.32s;"></div>
-                </div>
-                <span style="margin-left: 10px; color: #6c757d; font-size: 14px;">AIDE está digitando...</span>
-            </div>
-            <style>
-                @keyframes bounce {
-                    0%, 80%, 100% { transform: scale(0); }
-                    40% { transform: scale(1); }
-                }
-            </style>
-        """, unsafe_allow_html=True)
+        return st.markdown(_TYPING_INDICATOR_HTML, unsafe_allow_html=True)
+
+@st.cache_resource
+def _get_chat_interface() -> ChatInterface:
+    """Instância única do ChatInterface por processo"""
+    return ChatInterface()
 
 def render_chat_interface():
     """Função principal para renderizar a interface de chat"""
-    chat = ChatInterface()
+    # session_state é por usuário e não pode ficar no cache de recursos
+    init_chat_state()
+    chat = _get_chat_interface()
     
     # Container principal do chat
     st.markdown("### 💬 Assistente Inteligente AIDE")
@@ -384,52 +492,49 @@ def render_chat_interface():
     if len(st.session_state.messages) == 0:
         st.markdown("#### 💡 Perguntas Sugeridas")
         
-        cols = st.columns(2)
-        for idx, question in enumerate(chat.get_suggested_questions()[:4]):
-            with cols[idx % 2]:
-                if st.button(question, key=f"suggest_{idx}", use_container_width=True):
-                    st.session_state.messages.append({
-                        "role": "user",
-                        "content": question.split(' ', 1)[1],  # Remove emoji
-                        "timestamp": datetime.now()
-                    })
-                    st.rerun()
+        # Um único widget para todas as sugestões
+        choice = st.radio(
+            "Sugestões",
+            range(4),
+            format_func=_SUGGESTED_LABELS.__getitem__,
+            index=None,
+            key="suggestion_choice",
+            label_visibility="collapsed"
+        )
+        if choice is not None:
+            _append_message("user", _SUGGESTED_QUESTIONS[choice][1])
+            st.rerun()
     
     # Container de mensagens
     messages_container = st.container(height=400)
     
     with messages_container:
-        for message in st.session_state.messages:
-            timestamp = chat.format_message_timestamp(message.get('timestamp', datetime.now()))
-            
-            if message["role"] == "user":
-                st.markdown(f"""
-                    <div class="user-message" style="background: linear-gradient(135deg, #cfe4f9 0%, #e8f4fd 100%); 
-                                padding: 1rem; border-radius: 12px 12px 4px 12px; margin: 0.5rem 0; 
-                                border-left: 3px solid #3b82f6;">
-                        <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
-                            <strong>👤 Você</strong>
-                            <small style="color: #6c757d;">{timestamp}</small>
-                        </div>
-                        <div>{message["content"]}</div>
-                    </div>
-                """, unsafe_allow_html=True)
+        now = datetime.now()
+        now_bucket = now.replace(second=0, microsecond=0)
+        messages = st.session_state.messages
+        rendered = st.session_state['_rendered_html']
+        del rendered[len(messages):]
+        
+        for idx, message in enumerate(messages):
+            # Fragmentos já renderizados só são refeitos quando o rótulo
+            # relativo vence (virada do minuto); datas absolutas nunca mudam
+            fresh = '_ts_str' in message and message.get('_ts_bucket') in (None, now_bucket)
+            if fresh and idx < len(rendered):
+                continue
+            if not fresh:
+                _stamp_message(message, now)
+            html = _render_message_html(message["role"], message["content"], message['_ts_str'])
+            if idx < len(rendered):
+                rendered[idx] = html
             else:
-                st.markdown(f"""
-                    <div class="assistant-message" style="background: linear-gradient(135deg, #f9f7f4 0%, #ffffff 100%); 
-                                padding: 1rem; border-radius: 12px 12px 12px 4px; margin: 0.5rem 0; 
-                                border-left: 3px solid #e7cba9;">
-                        <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
-                            <strong>⚡ AIDE</strong>
-                            <small style="color: #6c757d;">{timestamp}</small>
-                        </div>
-                        <div>{message["content"]}</div>
-                    </div>
-                """, unsafe_allow_html=True)
+                rendered.append(html)
+        
+        # Um único st.markdown para todo o histórico
+        if rendered:
+            st.markdown("".join(rendered), unsafe_allow_html=True)
     
-    # Indicador de digitação
-    if st.session_state.is_typing:
-        chat.render_typing_indicator()
+    # Indicador de digitação (preenchido apenas durante o processamento)
+    typing_placeholder = st.empty()
     
     # Área de input
     col1, col2, col3 = st.columns([5, 1, 1])
@@ -451,39 +556,22 @@ def render_chat_interface():
     # Processar envio
     if send_button and user_input:
         # Adicionar mensagem do usuário
-        st.session_state.messages.append({
-            "role": "user",
-            "content": user_input,
-            "timestamp": datetime.now()
-        })
+        _append_message("user", user_input)
         
-        # Simular processamento
-        st.session_state.is_typing = True
-        st.rerun()
-    
-    # Simular resposta (após rerun com is_typing = True)
-    if st.session_state.is_typing:
-        time.sleep(1.5)  # Simular processamento
+        # Analisar query e gerar resposta na mesma execução
+        with typing_placeholder:
+            chat.render_typing_indicator()
+        query_analysis = chat.process_user_query(user_input)
+        response = chat.generate_response(query_analysis)
         
-        # Analisar query e gerar resposta
-        last_message = st.session_state.messages[-1]
-        if last_message["role"] == "user":
-            query_analysis = chat.process_user_query(last_message["content"])
-            response = chat.generate_response(query_analysis)
-            
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": response,
-                "timestamp": datetime.now()
-            })
+        _append_message("assistant", response)
         
-        st.session_state.is_typing = False
         st.rerun()
     
     # Limpar chat
     if clear_button:
         st.session_state.messages = []
-        st.session_state.suggested_questions = chat.get_suggested_questions()
+        st.session_state['_rendered_html'] = []
         st.rerun()
     
     # Informações adicionais
@@ -510,4 +598,4 @@ def render_chat_interface():
         """)
 
 # Exportar funções
-__all__ = ['ChatInterface', 'render_chat_interface']
\ No newline at end of file
+__all__ = ['ChatInterface', 'QueryAnalysis', 'render_chat_interface']
\ No newline at end of file
@@ -3,13 +3,120 @@ AIDE - Componente de Métricas
 Cards de KPIs e indicadores do sistema elétrico
 """
 
+import math
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 import plotly.graph_objects as go
 
+# (divisor, sufixo) indexados por ordem de grandeza // 3
+_VALUE_SCALES = ((1, ''), (1e3, 'k'), (1e6, 'M'), (1e9, 'G'))
+
+# Layout fixo dos sparklines
+_SPARK_LAYOUT = dict(
+    height=60,
+    margin=dict(l=0, r=0, t=0, b=0),
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    xaxis=dict(visible=False),
+    yaxis=dict(visible=False),
+    hovermode='x'
+)
+
+@lru_cache(maxsize=32)
+def _hex_to_rgba(color: str, alpha: float = 0.1) -> str:
+    """Converte '#rrggbb' em 'rgba(r, g, b, alpha)'"""
+    return f'rgba({int(color[1:3], 16)}, {int(color[3:5], 16)}, {int(color[5:7], 16)}, {alpha})'
+
+# Variações de várias métricas de uma vez. Direções como int8:
+# 1 = alta, -1 = queda, 0 = estável (ou sem base de comparação)
+_DIRECTION_NAMES = {1: 'positive', -1: 'negative', 0: 'neutral'}
+
+def calc_deltas(curr: np.ndarray, prev: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Versão vetorizada de calculate_delta: (variações %, direções int8)"""
+    curr = np.asarray(curr, dtype=np.float64)
+    prev = np.asarray(prev, dtype=np.float64)
+    safe_prev = np.where(prev == 0, 1.0, prev)
+    deltas = np.where(prev == 0, 0.0, (curr - prev) / safe_prev * 100)
+    return deltas, np.sign(deltas).astype(np.int8)
+
+def _spark_figure(data: np.ndarray, color: str) -> go.Figure:
+    """Sparkline montado a partir de spec em dicionário"""
+    n = len(data)
+    
+    # Uma única trace: linha completa com marcador apenas no ponto final
+    sizes = np.zeros(n)
+    sizes[-1] = 6
+    
+    return go.Figure({
+        'data': [{
+            'type': 'scatter',
+            'x': np.arange(n),
+            'y': data,
+            'mode': 'lines+markers',
+            'line': {'color': color, 'width': 2},
+            'marker': {'size': sizes, 'color': color},
+            'fill': 'tozeroy',
+            'fillcolor': _hex_to_rgba(color),
+            'showlegend': False,
+            'hovertemplate': '%{y:.1f}<extra></extra>'
+        }],
+        'layout': _SPARK_LAYOUT
+    })
+
+# Templates HTML dos cards de métrica
+_DELTA_BG_COLORS = {
+    'positive': '#d1fae5',
+    'negative': '#fee2e2',
+    'neutral': '#f3f4f6',
+    'warning': '#fed7aa'
+}
+
+_DELTA_TPL = """
+                <div class="metric-delta" style="font-size: 0.875rem; font-weight: 500; 
+                            padding: 0.25rem 0.5rem; border-radius: 6px; display: inline-block;
+                            background: {bg_color}; color: {text_color};">
+                    {delta}
+                </div>
+            """
+
+_SUBTITLE_TPL = '<div style="color: #9ca3af; font-size: 0.75rem; margin-top: 0.25rem;">{subtitle}</div>'
+
+_CARD_TPL = """
+            <div class="metric-card" style="background: #FFFFFF; border: 1px solid #e9ecef; 
+                        border-radius: 12px; padding: 1.25rem; margin: 0.5rem; 
+                        transition: all 0.3s ease; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);">
+                <div style="display: flex; align-items: start; justify-content: space-between;">
+                    <div style="flex: 1;">
+                        <div class="metric-label" style="color: #6c757d; font-size: 0.875rem; 
+                                    font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; 
+                                    margin-bottom: 0.5rem;">
+                            {title}
+                        </div>
+                        <div class="metric-value" style="color: #2c3e50; font-size: 2rem; 
+                                    font-weight: 700; margin: 0.25rem 0;">
+                            {value}
+                        </div>
+                        {delta_html}
+                        {subtitle_html}
+                    </div>
+                    <div style="font-size: 2rem; opacity: 0.8;">{icon}</div>
+                </div>
+            </div>
+        """
+
+# CMO médio nacional usado como referência nos cards regionais
+_CMO_REFERENCIA = 142.30
+
+# Bloco de um subsistema: título + grade com os quatro cards
+_REGION_GRID_TPL = """
+    <div style="margin: 1rem 0 0.25rem 0.5rem; font-weight: 700; color: #2c3e50;">{region}</div>
+    <div style="display: grid; grid-template-columns: repeat(4, minmax(0, 1fr));">{cards}</div>
+"""
+
 class MetricsDisplay:
     """Classe para gerenciar exibição de métricas"""
     
@@ -46,14 +153,12 @@ class MetricsDisplay:
     
     def format_value(self, value: float, unit: str = '', precision: int = 1) -> str:
         """Formata valores com unidades apropriadas"""
-        if value >= 1e9:
-            return f"{value/1e9:.{precision}f}G{unit}"
-        elif value >= 1e6:
-            return f"{value/1e6:.{precision}f}M{unit}"
-        elif value >= 1e3:
-            return f"{value/1e3:.{precision}f}k{unit}"
-        else:
+        if not 1e3 <= value < math.inf:
             return f"{value:.{precision}f}{unit}"
+        
+        # Escala escolhida pela ordem de grandeza, sem cadeia de comparações
+        divisor, suffix = _VALUE_SCALES[min(int(math.log10(value)) // 3, 3)]
+        return f"{value/divisor:.{precision}f}{suffix}{unit}"
     
     def render_metric_card(self, title: str, value: str, delta: Optional[str] = None, 
                           delta_color: str = 'neutral', icon: str = '📊',
@@ -62,147 +167,215 @@ class MetricsDisplay:
         
         delta_html = ''
         if delta:
-            bg_color = {
-                'positive': '#d1fae5',
-                'negative': '#fee2e2',
-                'neutral': '#f3f4f6',
-                'warning': '#fed7aa'
-            }.get(delta_color, '#f3f4f6')
-            
-            text_color = self.metric_colors.get(delta_color, '#6c757d')
-            
-            delta_html = f"""
-                <div class="metric-delta" style="font-size: 0.875rem; font-weight: 500; 
-                            padding: 0.25rem 0.5rem; border-radius: 6px; display: inline-block;
-                            background: {bg_color}; color: {text_color};">
-                    {delta}
-                </div>
-            """
+            delta_html = _DELTA_TPL.format(
+                bg_color=_DELTA_BG_COLORS.get(delta_color, '#f3f4f6'),
+                text_color=self.metric_colors.get(delta_color, '#6c757d'),
+                delta=delta
+            )
         
-        subtitle_html = ''
-        if subtitle:
-            subtitle_html = f'<div style="color: #9ca3af; font-size: 0.75rem; margin-top: 0.25rem;">{subtitle}</div>'
+        subtitle_html = _SUBTITLE_TPL.format(subtitle=subtitle) if subtitle else ''
         
-        return f"""
-            <div class="metric-card" style="background: #FFFFFF; border: 1px solid #e9ecef; 
-                        border-radius: 12px; padding: 1.25rem; margin: 0.5rem; 
-                        transition: all 0.3s ease; box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);">
-                <div style="display: flex; align-items: start; justify-content: space-between;">
-                    <div style="flex: 1;">
-                        <div class="metric-label" style="color: #6c757d; font-size: 0.875rem; 
-                                    font-weight: 500; text-transform: uppercase; letter-spacing: 0.5px; 
-                                    margin-bottom: 0.5rem;">
-                            {title}
-                        </div>
-                        <div class="metric-value" style="color: #2c3e50; font-size: 2rem; 
-                                    font-weight: 700; margin: 0.25rem 0;">
-                            {value}
-                        </div>
-                        {delta_html}
-                        {subtitle_html}
-                    </div>
-                    <div style="font-size: 2rem; opacity: 0.8;">{icon}</div>
-                </div>
-            </div>
-        """
+        return _CARD_TPL.format(
+            title=title,
+            value=value,
+            delta_html=delta_html,
+            subtitle_html=subtitle_html,
+            icon=icon
+        )
     
-    def render_mini_chart(self, data: List[float], title: str, color: str = '#e7cba9') -> go.Figure:
-        """Cria um mini gráfico sparkline"""
-        fig = go.Figure()
-        
-        x = list(range(len(data)))
-        
-        # Linha principal
-        fig.add_trace(go.Scatter(
-            x=x,
-            y=data,
-            mode='lines',
-            line=dict(color=color, width=2),
-            fill='tozeroy',
-            fillcolor=f'rgba({int(color[1:3], 16)}, {int(color[3:5], 16)}, {int(color[5:7], 16)}, 0.1)',
-            showlegend=False,
-            hovertemplate='%{y:.1f}<extra></extra>'
-        ))
-        
-        # Ponto final
-        fig.add_trace(go.Scatter(
-            x=[x[-1]],
-            y=[data[-1]],
-            mode='markers',
-            marker=dict(size=6, color=color),
-            showlegend=False,
-            hovertemplate='%{y:.1f}<extra></extra>'
-        ))
-        
-        fig.update_layout(
-            height=60,
-            margin=dict(l=0, r=0, t=0, b=0),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(visible=False),
-            yaxis=dict(visible=False),
-            hovermode='x'
+    def render_regional_grid(self, regional_metrics: pd.DataFrame) -> str:
+        """Renderiza os cards de todos os subsistemas num único bloco HTML"""
+        df = regional_metrics.assign(
+            pct_sin=regional_metrics['carga'] / regional_metrics['carga'].sum() * 100,
+            cmo_delta=regional_metrics['cmo'] - _CMO_REFERENCIA
         )
         
-        return fig
+        parts = []
+        for row in df.itertuples():
+            cards = (
+                self.render_metric_card(
+                    title="Carga",
+                    value=f"{row.carga:,.0f} MW",
+                    delta=f"{row.pct_sin:.1f}% do SIN",
+                    icon="⚡"
+                ),
+                self.render_metric_card(
+                    title="CMO",
+                    value=f"R$ {row.cmo:.2f}",
+                    delta=f"{row.cmo_delta:+.2f} vs média",
+                    delta_color='negative' if row.cmo_delta > 0 else 'positive',
+                    icon="💰"
+                ),
+                self.render_metric_card(
+                    title="Reservatório",
+                    value=f"{row.reservatorio:.1f}%",
+                    delta=row.reserv_label,
+                    delta_color='positive' if row.reserv_label == 'Normal' else 'warning',
+                    icon="💧"
+                ),
+                self.render_metric_card(
+                    title="Intercâmbio",
+                    value=f"{abs(row.intercambio):,.0f} MW",
+                    delta=row.interc_label,
+                    icon="🔄"
+                )
+            )
+            parts.append(_REGION_GRID_TPL.format(region=row.Index, cards="".join(cards)))
+        
+        return "".join(parts)
+    
+    def render_mini_chart(self, data: List[float], title: str, color: str = '#e7cba9') -> go.Figure:
+        """Cria um mini gráfico sparkline"""
+        return _spark_figure(np.asarray(data, dtype=np.float32), color)
     
-    def get_system_metrics(self) -> Dict:
+    @staticmethod
+    def get_system_metrics() -> Dict:
         """Obtém métricas do sistema (simulado)"""
-        return {
-            'carga_total': {
-                'value': 72845.3,
-                'previous': 70562.1,
-                'unit': 'MW',
-                'history': np.random.normal(72000, 2000, 24).tolist()
-            },
-            'cmo_medio': {
-                'value': 142.30,
-                'previous': 131.15,
-                'unit': 'R$/MWh',
-                'history': np.random.normal(140, 10, 24).tolist()
-            },
-            'reservatorios': {
-                'value': 58.3,
-                'previous': 56.2,
-                'unit': '%',
-                'history': np.random.normal(58, 2, 24).tolist()
-            },
-            'geracao_renovavel': {
-                'value': 78.5,
-                'previous': 75.2,
-                'unit': '%',
-                'history': np.random.normal(78, 3, 24).tolist()
-            }
-        }
+        return _get_system_metrics_cached(date.today().toordinal())
     
-    def get_regional_metrics(self) -> Dict:
+    @staticmethod
+    def get_regional_metrics() -> pd.DataFrame:
         """Obtém métricas regionais (simulado)"""
-        return {
-            'Sudeste/CO': {
-                'carga': 42350,
-                'cmo': 142.30,
-                'reservatorio': 58.3,
-                'intercambio': -1110
-            },
-            'Sul': {
-                'carga': 15230,
-                'cmo': 138.45,
-                'reservatorio': 72.1,
-                'intercambio': -2000
-            },
-            'Nordeste': {
-                'carga': 9845,
-                'cmo': 155.20,
-                'reservatorio': 45.6,
-                'intercambio': 1230
-            },
-            'Norte': {
-                'carga': 5420,
-                'cmo': 162.80,
-                'reservatorio': 89.2,
-                'intercambio': 3890
-            }
+        return _get_regional_metrics_cached()
+
+# Título do eixo Y por métrica da aba de tendências
+_TREND_Y_TITLES = {
+    "Carga de Energia": "Carga (MW)",
+    "CMO/PLD": "CMO (R$/MWh)",
+    "Reservatórios": "Nível (%)",
+    "Geração Renovável": "Geração (%)"
+}
+
+# Layout comum do gráfico de tendências
+_TREND_LAYOUT_BASE = dict(
+    height=400,
+    hovermode='x unified',
+    plot_bgcolor='white',
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1
+    )
+)
+
+# Coluna regional e desvio fixo usados por métrica na aba de tendências
+_TREND_COLUMNS = {
+    "Carga de Energia": 'carga',
+    "CMO/PLD": 'cmo',
+    "Reservatórios": 'reservatorio'
+}
+_TREND_STDS = {'cmo': 10., 'reservatorio': 2.}
+
+# Ordem das métricas do sistema nos cálculos vetorizados
+_SYSTEM_KEYS = ('carga_total', 'cmo_medio', 'reservatorios', 'geracao_renovavel')
+
+# Apresentação dos KPIs da visão geral, na ordem de _SYSTEM_KEYS
+_KPI_SPECS = (
+    {'title': "Carga Total SIN", 'value_fmt': "{:.0f} MW", 'delta_unit': "%",
+     'icon': "⚡", 'subtitle': "vs. dia anterior", 'color': "#3b82f6"},
+    {'title': "CMO Médio Nacional", 'value_fmt': "R$ {:.2f}", 'delta_unit': "%",
+     'icon': "💰", 'subtitle': "R$/MWh", 'color': "#e7cba9"},
+    {'title': "Reservatórios SE/CO", 'value_fmt': "{:.1f}%", 'delta_unit': " pp",
+     'icon': "💧", 'subtitle': "Energia armazenada", 'color': "#10b981"},
+    {'title': "Geração Renovável", 'value_fmt': "{:.1f}%", 'delta_unit': " pp",
+     'icon': "🌱", 'subtitle': "Do total gerado", 'color': "#22c55e"}
+)
+_KPI_DIRECTION_SIGN = np.array([1, -1, 1, 1], dtype=np.int8)
+
+_KPI_ROW_TPL = """
+    <div style="display: grid; grid-template-columns: repeat(4, minmax(0, 1fr));">{cards}</div>
+"""
+
+# Média e desvio dos históricos simulados (carga, CMO, reservatórios, renováveis)
+_HISTORY_MEANS = np.array([72000., 140., 58., 78.], dtype=np.float32)
+_HISTORY_STDS = np.array([2000., 10., 2., 3.], dtype=np.float32)
+
+# Dados simulados, cacheados entre reruns do Streamlit. Cada dia usa um
+# gerador PCG64 próprio, então a mesma chave de cache produz os mesmos dados.
+_RNG_SEED = 20250101
+
+def _day_rng(day: int) -> np.random.Generator:
+    """Gerador determinístico para o dia (ordinal) informado"""
+    return np.random.default_rng((_RNG_SEED, day))
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_system_metrics_cached(day: int) -> Dict:
+    """Obtém métricas do sistema (simulado, determinístico por dia)"""
+    # Históricos de 24h das quatro métricas numa única amostragem
+    history = _HISTORY_MEANS[:, None] + _HISTORY_STDS[:, None] * _day_rng(day).standard_normal((4, 24), dtype=np.float32)
+    
+    return {
+        'carga_total': {
+            'value': 72845.3,
+            'previous': 70562.1,
+            'unit': 'MW',
+            'history': history[0]
+        },
+        'cmo_medio': {
+            'value': 142.30,
+            'previous': 131.15,
+            'unit': 'R$/MWh',
+            'history': history[1]
+        },
+        'reservatorios': {
+            'value': 58.3,
+            'previous': 56.2,
+            'unit': '%',
+            'history': history[2]
+        },
+        'geracao_renovavel': {
+            'value': 78.5,
+            'previous': 75.2,
+            'unit': '%',
+            'history': history[3]
         }
+    }
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_regional_metrics_cached() -> pd.DataFrame:
+    """Obtém métricas regionais (simulado), uma coluna por métrica"""
+    df = pd.DataFrame(
+        {
+            'carga': [42350, 15230, 9845, 5420],
+            'cmo': [142.30, 138.45, 155.20, 162.80],
+            'reservatorio': [58.3, 72.1, 45.6, 89.2],
+            'intercambio': [-1110, -2000, 1230, 3890]
+        },
+        index=['Sudeste/CO', 'Sul', 'Nordeste', 'Norte']
+    )
+    
+    # Classificações vetorizadas usadas nos cards
+    df['reserv_label'] = np.where(df['reservatorio'] > 50, 'Normal', 'Baixo')
+    df['interc_label'] = np.where(df['intercambio'] > 0, 'Exportador', 'Importador')
+    return df
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _trend_series(metric_option: str, seed: int) -> List[Tuple[str, np.ndarray]]:
+    """Séries de 30 dias (simuladas) para a aba de tendências"""
+    rng = _day_rng(seed)
+    regional_metrics = _get_regional_metrics_cached()
+    
+    if metric_option == "Geração Renovável":
+        names = ['Hidrelétrica', 'Solar', 'Eólica', 'Biomassa']
+        means = np.full(len(names), 20., dtype=np.float32)
+        stds = np.full(len(names), 5., dtype=np.float32)
+    else:
+        names = list(regional_metrics.index)
+        column = _TREND_COLUMNS[metric_option]
+        means = regional_metrics[column].to_numpy(dtype=np.float32)
+        stds = means * np.float32(0.05) if column == 'carga' else np.full(len(names), _TREND_STDS[column], dtype=np.float32)
+    
+    # Todas as séries numa única amostragem (n_series, 30) em float32
+    samples = means[:, None] + stds[:, None] * rng.standard_normal((len(names), 30), dtype=np.float32)
+    return list(zip(names, samples))
+
+@st.cache_data(show_spinner=False)
+def _last_n_days(n: int, anchor: date) -> np.ndarray:
+    """Últimos `n` dias terminando em `anchor` (recalculado uma vez por dia)"""
+    end = np.datetime64(anchor, 'D')
+    return np.arange(end - np.timedelta64(n - 1, 'D'), end + np.timedelta64(1, 'D'), dtype='datetime64[D]')
 
 def render_metrics_dashboard():
     """Renderiza o dashboard completo de métricas"""
@@ -218,76 +391,37 @@ def render_metrics_dashboard():
     tab1, tab2, tab3 = st.tabs(["🎯 Visão Geral", "🗺️ Regional", "📈 Tendências"])
     
     with tab1:
-        # Métricas principais
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            carga = system_metrics['carga_total']
-            delta, direction = metrics.calculate_delta(carga['value'], carga['previous'])
-            
-            st.markdown(metrics.render_metric_card(
-                title="Carga Total SIN",
-                value=f"{carga['value']:.0f} MW",
-                delta=f"{'↑' if delta > 0 else '↓'} {abs(delta):.1f}%",
-                delta_color=direction,
-                icon="⚡",
-                subtitle="vs. dia anterior"
-            ), unsafe_allow_html=True)
-            
-            # Mini chart
-            fig = metrics.render_mini_chart(carga['history'], "Últimas 24h", "#3b82f6")
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-        
-        with col2:
-            cmo = system_metrics['cmo_medio']
-            delta, direction = metrics.calculate_delta(cmo['value'], cmo['previous'])
-            
-            # Inverter direção para CMO (menor é melhor)
-            direction = 'negative' if direction == 'positive' else 'positive' if direction == 'negative' else 'neutral'
-            
-            st.markdown(metrics.render_metric_card(
-                title="CMO Médio Nacional",
-                value=f"R$ {cmo['value']:.2f}",
-                delta=f"{'↑' if delta > 0 else '↓'} {abs(delta):.1f}%",
-                delta_color=direction,
-                icon="💰",
-                subtitle="R$/MWh"
-            ), unsafe_allow_html=True)
-            
-            fig = metrics.render_mini_chart(cmo['history'], "Últimas 24h", "#e7cba9")
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-        
-        with col3:
-            reserv = system_metrics['reservatorios']
-            delta, direction = metrics.calculate_delta(reserv['value'], reserv['previous'])
-            
-            st.markdown(metrics.render_metric_card(
-                title="Reservatórios SE/CO",
-                value=f"{reserv['value']:.1f}%",
-                delta=f"{'↑' if delta > 0 else '↓'} {abs(delta):.1f} pp",
-                delta_color=direction,
-                icon="💧",
-                subtitle="Energia armazenada"
-            ), unsafe_allow_html=True)
-            
-            fig = metrics.render_mini_chart(reserv['history'], "Últimas 24h", "#10b981")
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        # Variações das quatro métricas numa única chamada
+        deltas, dirs = calc_deltas(
+            [system_metrics[key]['value'] for key in _SYSTEM_KEYS],
+            [system_metrics[key]['previous'] for key in _SYSTEM_KEYS]
+        )
+        arrows = np.where(deltas > 0, '↑', np.where(deltas < 0, '↓', '→'))
+        
+        # CMO: menor é melhor, então a direção é invertida
+        dirs = dirs * _KPI_DIRECTION_SIGN
+        
+        # Métricas principais: os quatro cards num único bloco HTML
+        cards = [
+            metrics.render_metric_card(
+                title=spec['title'],
+                value=spec['value_fmt'].format(system_metrics[key]['value']),
+                delta=f"{arrow} {abs(delta):.1f}{spec['delta_unit']}",
+                delta_color=_DIRECTION_NAMES[direction],
+                icon=spec['icon'],
+                subtitle=spec['subtitle']
+            )
+            for key, spec, delta, arrow, direction in zip(
+                _SYSTEM_KEYS, _KPI_SPECS, deltas.tolist(), arrows.tolist(), dirs.tolist()
+            )
+        ]
+        st.markdown(_KPI_ROW_TPL.format(cards="".join(cards)), unsafe_allow_html=True)
         
-        with col4:
-            renov = system_metrics['geracao_renovavel']
-            delta, direction = metrics.calculate_delta(renov['value'], renov['previous'])
-            
-            st.markdown(metrics.render_metric_card(
-                title="Geração Renovável",
-                value=f"{renov['value']:.1f}%",
-                delta=f"{'↑' if delta > 0 else '↓'} {abs(delta):.1f} pp",
-                delta_color=direction,
-                icon="🌱",
-                subtitle="Do total gerado"
-            ), unsafe_allow_html=True)
-            
-            fig = metrics.render_mini_chart(renov['history'], "Últimas 24h", "#22c55e")
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        # Mini charts das últimas 24h
+        for col, key, spec in zip(st.columns(4), _SYSTEM_KEYS, _KPI_SPECS):
+            with col:
+                fig = metrics.render_mini_chart(system_metrics[key]['history'], "Últimas 24h", spec['color'])
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
         
         # Status das bandeiras
         st.markdown("#### 🚦 Status das Bandeiras Tarifárias")
@@ -310,38 +444,7 @@ def render_metrics_dashboard():
         # Métricas regionais
         st.markdown("#### 🗺️ Indicadores por Subsistema")
         
-        for region, data in regional_metrics.items():
-            with st.expander(f"**{region}**", expanded=True):
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric(
-                        "Carga",
-                        f"{data['carga']:,.0f} MW",
-                        f"{(data['carga']/72845*100):.1f}% do SIN"
-                    )
-                
-                with col2:
-                    st.metric(
-                        "CMO",
-                        f"R$ {data['cmo']:.2f}",
-                        f"{data['cmo']-142.30:+.2f} vs média"
-                    )
-                
-                with col3:
-                    st.metric(
-                        "Reservatório",
-                        f"{data['reservatorio']:.1f}%",
-                        "Normal" if data['reservatorio'] > 50 else "Baixo"
-                    )
-                
-                with col4:
-                    intercambio_label = "Exportador" if data['intercambio'] > 0 else "Importador"
-                    st.metric(
-                        "Intercâmbio",
-                        f"{abs(data['intercambio']):,.0f} MW",
-                        intercambio_label
-                    )
+        st.markdown(metrics.render_regional_grid(regional_metrics), unsafe_allow_html=True)
     
     with tab3:
         # Análise de tendências
@@ -355,86 +458,29 @@ def render_metrics_dashboard():
         )
         
         # Gráfico de tendência
-        dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
-        
-        fig = go.Figure()
-        
-        # Dados simulados baseados na métrica selecionada
-        if metric_option == "Carga de Energia":
-            for region in regional_metrics.keys():
-                values = np.random.normal(
-                    regional_metrics[region]['carga'], 
-                    regional_metrics[region]['carga'] * 0.05, 
-                    30
-                )
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=values,
-                    mode='lines+markers',
-                    name=region,
-                    line=dict(width=2.5)
-                ))
-            y_title = "Carga (MW)"
-        
-        elif metric_option == "CMO/PLD":
-            for region in regional_metrics.keys():
-                values = np.random.normal(
-                    regional_metrics[region]['cmo'], 
-                    10, 
-                    30
-                )
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=values,
-                    mode='lines+markers',
-                    name=region,
-                    line=dict(width=2.5)
-                ))
-            y_title = "CMO (R$/MWh)"
-        
-        elif metric_option == "Reservatórios":
-            for region in regional_metrics.keys():
-                values = np.random.normal(
-                    regional_metrics[region]['reservatorio'], 
-                    2, 
-                    30
-                )
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=values,
-                    mode='lines+markers',
-                    name=region,
-                    line=dict(width=2.5)
-                ))
-            y_title = "Nível (%)"
-        
-        else:  # Geração Renovável
-            sources = ['Hidrelétrica', 'Solar', 'Eólica', 'Biomassa']
-            for source in sources:
-                values = np.random.normal(20, 5, 30)
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=values,
-                    mode='lines+markers',
-                    name=source,
-                    line=dict(width=2.5)
-                ))
-            y_title = "Geração (%)"
+        dates = _last_n_days(30, date.today())
+        
+        # Dados simulados baseados na métrica selecionada (estáveis no dia)
+        fig = go.Figure({
+            'data': [
+                {
+                    'type': 'scatter',
+                    'x': dates,
+                    'y': values,
+                    'mode': 'lines+markers',
+                    'name': name,
+                    'line': {'width': 2.5}
+                }
+                for name, values in _trend_series(metric_option, date.today().toordinal())
+            ]
+        })
+        y_title = _TREND_Y_TITLES[metric_option]
         
         fig.update_layout(
             title=f"Tendência - {metric_option} (30 dias)",
             xaxis_title="Data",
             yaxis_title=y_title,
-            height=400,
-            hovermode='x unified',
-            plot_bgcolor='white',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
+            **_TREND_LAYOUT_BASE
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -460,25 +506,26 @@ def render_metrics_dashboard():
                 - Previsão de alta demanda próxima semana
             """)
 
+# Unidades das métricas regionais numéricas
+_REGIONAL_UNITS = {
+    'carga': 'MW',
+    'cmo': 'R$/MWh',
+    'reservatorio': '%',
+    'intercambio': 'MW'
+}
+
 # Função auxiliar para obter métricas específicas
 def get_metric_value(metric_type: str, region: Optional[str] = None) -> Dict:
     """Obtém valor de uma métrica específica"""
-    metrics = MetricsDisplay()
-    
     if region:
-        regional = metrics.get_regional_metrics()
-        if region in regional and metric_type in regional[region]:
+        regional = MetricsDisplay.get_regional_metrics()
+        if region in regional.index and metric_type in _REGIONAL_UNITS:
             return {
-                'value': regional[region][metric_type],
-                'unit': {
-                    'carga': 'MW',
-                    'cmo': 'R$/MWh',
-                    'reservatorio': '%',
-                    'intercambio': 'MW'
-                }.get(metric_type, '')
+                'value': regional.at[region, metric_type].item(),
+                'unit': _REGIONAL_UNITS[metric_type]
             }
     else:
-        system = metrics.get_system_metrics()
+        system = MetricsDisplay.get_system_metrics()
         if metric_type in system:
             return {
                 'value': system[metric_type]['value'],
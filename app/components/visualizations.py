@@ -11,58 +11,68 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from functools import lru_cache
 import json
+import plotly.io as pio
+
+try:
+    # Serialização das figuras via orjson (arrays numpy sem dispatch por valor)
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 class VisualizationEngine:
     """Motor de visualização para gráficos do AIDE"""
     
-    def __init__(self):
-        # Paleta de cores principal
-        self.colors = {
-            'primary': '#e7cba9',
-            'secondary': '#cfe4f9',
-            'success': '#10b981',
-            'warning': '#f59e0b',
-            'danger': '#ef4444',
-            'info': '#3b82f6',
-            'dark': '#2c3e50',
-            'light': '#f8f9fa'
-        }
-        
-        # Cores por subsistema
-        self.subsystem_colors = {
-            'Sudeste/CO': '#3b82f6',
-            'Sul': '#10b981',
-            'Nordeste': '#f59e0b',
-            'Norte': '#ef4444'
-        }
-        
-        # Cores por fonte de energia
-        self.source_colors = {
-            'Hidrelétrica': '#3b82f6',
-            'Solar': '#fbbf24',
-            'Eólica': '#10b981',
-            'Térmica': '#ef4444',
-            'Nuclear': '#8b5cf6',
-            'Biomassa': '#84cc16'
-        }
-        
-        # Configuração padrão dos layouts
-        self.default_layout = {
-            'font': {'family': 'Inter, sans-serif', 'size': 12},
-            'plot_bgcolor': 'white',
-            'paper_bgcolor': 'white',
-            'margin': dict(l=60, r=30, t=60, b=60),
-            'hovermode': 'x unified',
-            'showlegend': True,
-            'legend': dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        }
+    # Paleta de cores principal
+    colors = MappingProxyType({
+        'primary': '#e7cba9',
+        'secondary': '#cfe4f9',
+        'success': '#10b981',
+        'warning': '#f59e0b',
+        'danger': '#ef4444',
+        'info': '#3b82f6',
+        'dark': '#2c3e50',
+        'light': '#f8f9fa'
+    })
+    
+    # Cores por subsistema
+    subsystem_colors = MappingProxyType({
+        'Sudeste/CO': '#3b82f6',
+        'Sul': '#10b981',
+        'Nordeste': '#f59e0b',
+        'Norte': '#ef4444'
+    })
+    
+    # Cores por fonte de energia
+    source_colors = MappingProxyType({
+        'Hidrelétrica': '#3b82f6',
+        'Solar': '#fbbf24',
+        'Eólica': '#10b981',
+        'Térmica': '#ef4444',
+        'Nuclear': '#8b5cf6',
+        'Biomassa': '#84cc16'
+    })
+    
+    # Configuração padrão dos layouts (compartilhada, somente leitura)
+    default_layout = MappingProxyType({
+        'font': {'family': 'Inter, sans-serif', 'size': 12},
+        'plot_bgcolor': 'white',
+        'paper_bgcolor': 'white',
+        'margin': dict(l=60, r=30, t=60, b=60),
+        'hovermode': 'x unified',
+        'showlegend': True,
+        'legend': dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    })
     
     def create_time_series(self, 
                           data: pd.DataFrame, 
@@ -73,83 +83,96 @@ class VisualizationEngine:
                           show_forecast: bool = False) -> go.Figure:
         """Cria gráfico de série temporal"""
         
-        fig = go.Figure()
+        # Figura montada como spec em dicionário; a validação do Plotly é
+        # mantida de propósito para que specs inválidas falhem na hora
+        traces = []
         
-        # Adicionar séries
-        for series in data[series_column].unique():
-            series_data = data[data[series_column] == series]
-            
+        # Previsões separadas por série numa única passada
+        forecast_groups = {}
+        if show_forecast and 'forecast' in data.columns:
+            forecast_groups = dict(tuple(
+                data[data['forecast'] == True].groupby(series_column, sort=False, observed=True)
+            ))
+        
+        # Adicionar séries (groupby particiona o frame uma única vez)
+        for series, series_data in data.groupby(series_column, sort=False, observed=True):
             color = self.subsystem_colors.get(series, self.colors['primary'])
             
             # Linha principal
-            fig.add_trace(go.Scatter(
-                x=series_data['date'],
-                y=series_data[value_column],
-                mode='lines',
-                name=series,
-                line=dict(color=color, width=2.5),
-                hovertemplate=f'<b>{series}</b><br>%{{x}}<br>%{{y:.1f}}<extra></extra>'
-            ))
+            traces.append({
+                'type': 'scatter',
+                'x': series_data['date'],
+                'y': series_data[value_column].to_numpy(dtype=np.float32),
+                'mode': 'lines',
+                'name': series,
+                'line': {'color': color, 'width': 2.5},
+                'hovertemplate': f'<b>{series}</b><br>%{{x}}<br>%{{y:.1f}}<extra></extra>'
+            })
             
             # Se houver previsão
-            if show_forecast and 'forecast' in series_data.columns:
-                forecast_data = series_data[series_data['forecast'] == True]
-                if not forecast_data.empty:
-                    fig.add_trace(go.Scatter(
-                        x=forecast_data['date'],
-                        y=forecast_data[value_column],
-                        mode='lines',
-                        name=f'{series} (Previsão)',
-                        line=dict(color=color, width=2.5, dash='dash'),
-                        hovertemplate=f'<b>{series} (Previsão)</b><br>%{{x}}<br>%{{y:.1f}}<extra></extra>'
-                    ))
+            forecast_data = forecast_groups.get(series)
+            if forecast_data is not None and not forecast_data.empty:
+                traces.append({
+                    'type': 'scatter',
+                    'x': forecast_data['date'],
+                    'y': forecast_data[value_column].to_numpy(dtype=np.float32),
+                    'mode': 'lines',
+                    'name': f'{series} (Previsão)',
+                    'line': {'color': color, 'width': 2.5, 'dash': 'dash'},
+                    'hovertemplate': f'<b>{series} (Previsão)</b><br>%{{x}}<br>%{{y:.1f}}<extra></extra>'
+                })
         
         # Adicionar anotações para eventos importantes
         annotations = []
         if 'events' in data.columns:
-            events = data[data['events'].notna()]
-            for _, event in events.iterrows():
-                annotations.append(dict(
-                    x=event['date'],
-                    y=event[value_column],
-                    text=event['events'],
-                    showarrow=True,
-                    arrowhead=2,
-                    arrowsize=1,
-                    arrowwidth=2,
-                    arrowcolor=self.colors['warning'],
-                    ax=0,
-                    ay=-40
-                ))
-        
-        # Layout
-        fig.update_layout(
-            title=title,
-            xaxis_title="Data",
-            yaxis_title=y_label,
-            height=450,
+            mask = data['events'].notna().to_numpy()
+            if mask.any():
+                annotations = [
+                    dict(
+                        x=x,
+                        y=y,
+                        text=text,
+                        showarrow=True,
+                        arrowhead=2,
+                        arrowsize=1,
+                        arrowwidth=2,
+                        arrowcolor=self.colors['warning'],
+                        ax=0,
+                        ay=-40
+                    )
+                    for x, y, text in zip(
+                        data['date'].to_numpy()[mask],
+                        data[value_column].to_numpy()[mask],
+                        data['events'].to_numpy()[mask]
+                    )
+                ]
+        
+        # Layout com range selector
+        layout = {
+            'title': title,
+            'xaxis': {
+                'title': "Data",
+                'rangeselector': dict(
+                    buttons=[
+                        dict(count=1, label="1d", step="day", stepmode="backward"),
+                        dict(count=7, label="7d", step="day", stepmode="backward"),
+                        dict(count=1, label="1m", step="month", stepmode="backward"),
+                        dict(count=3, label="3m", step="month", stepmode="backward"),
+                        dict(step="all", label="Tudo")
+                    ],
+                    bgcolor=self.colors['secondary'],
+                    activecolor=self.colors['primary']
+                ),
+                'rangeslider': dict(visible=False),
+                'type': "date"
+            },
+            'yaxis': {'title': y_label},
+            'height': 450,
             **self.default_layout,
-            annotations=annotations
-        )
-        
-        # Adicionar range selector
-        fig.update_xaxes(
-            rangeselector=dict(
-                buttons=list([
-                    dict(count=1, label="1d", step="day", stepmode="backward"),
-                    dict(count=7, label="7d", step="day", stepmode="backward"),
-                    dict(count=1, label="1m", step="month", stepmode="backward"),
-                    dict(count=3, label="3m", step="month", stepmode="backward"),
-                    dict(step="all", label="Tudo")
-                ]),
-                bgcolor=self.colors['secondary'],
-                activecolor=self.colors['primary']
-            ),
-            rangeslider=dict(visible=False),
-            type="date"
-        )
+            'annotations': annotations
+        }
         
-        return fig
+        return go.Figure({'data': traces, 'layout': layout})
     
     def create_heatmap(self,
                       data: pd.DataFrame,
@@ -161,34 +184,33 @@ class VisualizationEngine:
         # Preparar dados para o heatmap
         pivot_data = data.pivot(index=y_label.lower(), columns=x_label.lower(), values='value')
         
-        fig = go.Figure(data=go.Heatmap(
-            z=pivot_data.values,
-            x=pivot_data.columns,
-            y=pivot_data.index,
-            colorscale=[
-                [0, self.colors['secondary']],
-                [0.5, self.colors['primary']],
-                [1, self.colors['danger']]
-            ],
-            colorbar=dict(
-                title="MW",
-                titleside="right",
-                tickmode="linear",
-                tick0=0,
-                dtick=1000
-            ),
-            hovertemplate='%{y}<br>%{x}h<br>%{z:.0f} MW<extra></extra>'
-        ))
-        
-        fig.update_layout(
-            title=title,
-            xaxis_title=x_label,
-            yaxis_title=y_label,
-            height=400,
-            **self.default_layout
-        )
-        
-        return fig
+        return go.Figure({
+            'data': [{
+                'type': 'heatmap',
+                'z': np.ascontiguousarray(pivot_data.to_numpy(dtype=np.float32, copy=False)),
+                'x': pivot_data.columns,
+                'y': pivot_data.index,
+                'colorscale': [
+                    [0, self.colors['secondary']],
+                    [0.5, self.colors['primary']],
+                    [1, self.colors['danger']]
+                ],
+                'colorbar': dict(
+                    title=dict(text="MW", side="right"),
+                    tickmode="linear",
+                    tick0=0,
+                    dtick=1000
+                ),
+                'hovertemplate': '%{y}<br>%{x}h<br>%{z:.0f} MW<extra></extra>'
+            }],
+            'layout': {
+                'title': title,
+                'xaxis': {'title': x_label},
+                'yaxis': {'title': y_label},
+                'height': 400,
+                **self.default_layout
+            }
+        })
     
     def create_gauge(self,
                     value: float,
@@ -205,34 +227,34 @@ class VisualizationEngine:
                 'high': max_value
             }
         
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=value,
-            title={'text': title, 'font': {'size': 18}},
-            delta={'reference': thresholds['medium']},
-            gauge={
-                'axis': {'range': [min_value, max_value]},
-                'bar': {'color': self.colors['primary']},
-                'steps': [
-                    {'range': [min_value, thresholds['low']], 'color': self.colors['success']},
-                    {'range': [thresholds['low'], thresholds['medium']], 'color': self.colors['warning']},
-                    {'range': [thresholds['medium'], thresholds['high']], 'color': self.colors['danger']}
-                ],
-                'threshold': {
-                    'line': {'color': self.colors['dark'], 'width': 4},
-                    'thickness': 0.75,
-                    'value': value
+        return go.Figure({
+            'data': [{
+                'type': 'indicator',
+                'mode': "gauge+number+delta",
+                'value': value,
+                'title': {'text': title, 'font': {'size': 18}},
+                'delta': {'reference': thresholds['medium']},
+                'gauge': {
+                    'axis': {'range': [min_value, max_value]},
+                    'bar': {'color': self.colors['primary']},
+                    'steps': [
+                        {'range': [min_value, thresholds['low']], 'color': self.colors['success']},
+                        {'range': [thresholds['low'], thresholds['medium']], 'color': self.colors['warning']},
+                        {'range': [thresholds['medium'], thresholds['high']], 'color': self.colors['danger']}
+                    ],
+                    'threshold': {
+                        'line': {'color': self.colors['dark'], 'width': 4},
+                        'thickness': 0.75,
+                        'value': value
+                    }
                 }
+            }],
+            'layout': {
+                'height': 250,
+                'margin': dict(l=20, r=20, t=40, b=20),
+                'paper_bgcolor': 'white'
             }
-        ))
-        
-        fig.update_layout(
-            height=250,
-            margin=dict(l=20, r=20, t=40, b=20),
-            paper_bgcolor='white'
-        )
-        
-        return fig
+        })
     
     def create_sankey(self,
                      sources: List[str],
@@ -241,50 +263,45 @@ class VisualizationEngine:
                      title: str) -> go.Figure:
         """Cria diagrama Sankey para fluxo de energia"""
         
-        # Criar lista única de nós
-        nodes = list(set(sources + targets))
-        node_dict = {node: i for i, node in enumerate(nodes)}
-        
-        # Mapear sources e targets para índices
-        source_indices = [node_dict[s] for s in sources]
-        target_indices = [node_dict[t] for t in targets]
+        # Nós únicos em ordem de aparição; factorize devolve os índices de
+        # origem/destino numa única passada
+        codes, nodes = pd.factorize(np.concatenate([np.asarray(sources), np.asarray(targets)]), sort=False)
+        source_indices = codes[:len(sources)]
+        target_indices = codes[len(sources):]
+        nodes = nodes.tolist()
         
         # Cores dos nós
-        node_colors = []
-        for node in nodes:
-            if node in self.subsystem_colors:
-                node_colors.append(self.subsystem_colors[node])
-            elif node in self.source_colors:
-                node_colors.append(self.source_colors[node])
-            else:
-                node_colors.append(self.colors['primary'])
-        
-        fig = go.Figure(data=[go.Sankey(
-            node=dict(
-                pad=15,
-                thickness=20,
-                line=dict(color="black", width=0.5),
-                label=nodes,
-                color=node_colors,
-                hovertemplate='%{label}<br>%{value:.0f} MW<extra></extra>'
-            ),
-            link=dict(
-                source=source_indices,
-                target=target_indices,
-                value=values,
-                color='rgba(231, 203, 169, 0.3)',
-                hovertemplate='%{source.label} → %{target.label}<br>%{value:.0f} MW<extra></extra>'
-            )
-        )])
-        
-        fig.update_layout(
-            title=title,
-            height=500,
-            font=dict(size=12),
-            paper_bgcolor='white'
-        )
-        
-        return fig
+        node_colors = [
+            self.subsystem_colors.get(node, self.source_colors.get(node, self.colors['primary']))
+            for node in nodes
+        ]
+        
+        return go.Figure({
+            'data': [{
+                'type': 'sankey',
+                'node': dict(
+                    pad=15,
+                    thickness=20,
+                    line=dict(color="black", width=0.5),
+                    label=nodes,
+                    color=node_colors,
+                    hovertemplate='%{label}<br>%{value:.0f} MW<extra></extra>'
+                ),
+                'link': dict(
+                    source=source_indices,
+                    target=target_indices,
+                    value=values,
+                    color='rgba(231, 203, 169, 0.3)',
+                    hovertemplate='%{source.label} → %{target.label}<br>%{value:.0f} MW<extra></extra>'
+                )
+            }],
+            'layout': {
+                'title': title,
+                'height': 500,
+                'font': dict(size=12),
+                'paper_bgcolor': 'white'
+            }
+        })
     
     def create_radar_chart(self,
                           categories: List[str],
@@ -292,35 +309,36 @@ class VisualizationEngine:
                           title: str) -> go.Figure:
         """Cria gráfico radar para comparação multidimensional"""
         
-        fig = go.Figure()
-        
+        traces = []
         for name, data in values.items():
             color = self.subsystem_colors.get(name, self.colors['primary'])
             
-            fig.add_trace(go.Scatterpolar(
-                r=data,
-                theta=categories,
-                fill='toself',
-                name=name,
-                line=dict(color=color, width=2),
-                fillcolor=color.replace(')', ', 0.1)').replace('rgb', 'rgba') if 'rgb' in color else color + '20',
-                hovertemplate='%{theta}<br>%{r:.1f}<extra></extra>'
-            ))
-        
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, max([max(v) for v in values.values()])]
-                )
-            ),
-            showlegend=True,
-            title=title,
-            height=400,
-            **self.default_layout
-        )
-        
-        return fig
+            traces.append({
+                'type': 'scatterpolar',
+                'r': data,
+                'theta': categories,
+                'fill': 'toself',
+                'name': name,
+                'line': dict(color=color, width=2),
+                'fillcolor': color.replace(')', ', 0.1)').replace('rgb', 'rgba') if 'rgb' in color else color + '20',
+                'hovertemplate': '%{theta}<br>%{r:.1f}<extra></extra>'
+            })
+        
+        return go.Figure({
+            'data': traces,
+            'layout': {
+                **self.default_layout,
+                'polar': dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, max([max(v) for v in values.values()])]
+                    )
+                ),
+                'showlegend': True,
+                'title': title,
+                'height': 400
+            }
+        })
     
     def create_waterfall(self,
                         categories: List[str],
@@ -358,41 +376,134 @@ class VisualizationEngine:
                          title: str) -> go.Figure:
         """Cria gráfico 3D de superfície"""
         
-        fig = go.Figure(data=[go.Surface(
-            z=data.values,
-            x=data.columns,
-            y=data.index,
-            colorscale=[
-                [0, self.colors['secondary']],
-                [0.5, self.colors['primary']],
-                [1, self.colors['danger']]
-            ],
-            contours={
-                "z": {"show": True, "usecolormap": True, "highlightcolor": "limegreen", "project": {"z": True}}
+        return go.Figure({
+            'data': [{
+                'type': 'surface',
+                'z': np.ascontiguousarray(data.to_numpy(dtype=np.float32, copy=False)),
+                'x': data.columns,
+                'y': data.index,
+                'colorscale': [
+                    [0, self.colors['secondary']],
+                    [0.5, self.colors['primary']],
+                    [1, self.colors['danger']]
+                ],
+                'contours': {
+                    "z": {"show": True, "usecolormap": True, "highlightcolor": "limegreen", "project": {"z": True}}
+                }
+            }],
+            'layout': {
+                'title': title,
+                'autosize': False,
+                'width': 800,
+                'height': 600,
+                'scene': dict(
+                    xaxis=dict(title="Hora"),
+                    yaxis=dict(title="Dia"),
+                    zaxis=dict(title="Carga (MW)"),
+                    camera=dict(
+                        eye=dict(x=1.5, y=1.5, z=1.3)
+                    )
+                ),
+                'margin': dict(l=65, r=50, b=65, t=90)
             }
-        )])
-        
-        fig.update_layout(
-            title=title,
-            autosize=False,
-            width=800,
-            height=600,
-            scene=dict(
-                xaxis_title="Hora",
-                yaxis_title="Dia",
-                zaxis_title="Carga (MW)",
-                camera=dict(
-                    eye=dict(x=1.5, y=1.5, z=1.3)
-                )
-            ),
-            margin=dict(l=65, r=50, b=65, t=90)
-        )
-        
-        return fig
+        })
+
+# Dados simulados das demonstrações, cacheados entre reruns do Streamlit
+_DEMO_REGIONS = np.array(['Sudeste/CO', 'Sul', 'Nordeste', 'Norte'])
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _demo_timeseries(data_source: str) -> pd.DataFrame:
+    """Série diária de 30 dias por subsistema"""
+    rng = np.random.default_rng()
+    dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
+    
+    # Sudeste/CO ~ N(20000, 2000); demais ~ N(10000, 1000)
+    loc = np.array([20000., 10000., 10000., 10000.], dtype=np.float32)
+    scale = np.array([2000., 1000., 1000., 1000.], dtype=np.float32)
+    values = rng.standard_normal((len(_DEMO_REGIONS), len(dates)), dtype=np.float32)
+    values *= scale[:, None]
+    values += loc[:, None]
+    
+    return pd.DataFrame({
+        'date': np.tile(dates.values, len(_DEMO_REGIONS)),
+        'region': np.repeat(_DEMO_REGIONS, len(dates)),
+        'value': values.ravel()
+    })
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _demo_heatmap(data_source: str) -> pd.DataFrame:
+    """Carga por dia x hora da última semana (formato longo)"""
+    days = pd.date_range(end=datetime.now(), periods=7, freq='D').strftime('%d/%m')
+    
+    # Matriz dia x hora numa única amostragem, com acréscimo no pico (14h-20h)
+    base = np.random.default_rng().standard_normal((7, 24), dtype=np.float32)
+    base *= 5000
+    base += 70000
+    base[:, 14:21] += 2000
+    
+    # Colunas montadas direto como arrays; nomes batem com os rótulos
+    # passados a create_heatmap ("Data", "Hora do Dia")
+    return pd.DataFrame({
+        'data': np.repeat(np.asarray(days), 24),
+        'hora do dia': np.tile(np.arange(24), len(days)),
+        'value': base.ravel()
+    })
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _demo_surface(data_source: str) -> pd.DataFrame:
+    """Matriz 7 dias x 24 horas para a superfície 3D"""
+    # float32 em ordem C desde a geração: sem cópia/cast dentro do Plotly
+    data = np.random.default_rng().standard_normal((7, 24), dtype=np.float32)
+    data *= 5000
+    data += 70000
+    data[:, 14:21] += 3000
+    
+    return pd.DataFrame(data, 
+                        index=[f"Dia {i+1}" for i in range(7)],
+                        columns=[f"{h:02d}:00" for h in range(24)])
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _demo_hourly(mean: float, std: float) -> pd.DataFrame:
+    """Série horária de 24 pontos para os mini gráficos"""
+    return pd.DataFrame({
+        'x': np.arange(24),
+        'y': np.random.default_rng().standard_normal(24, dtype=np.float32) * np.float32(std) + np.float32(mean)
+    })
+
+@st.cache_resource
+def get_viz_engine() -> VisualizationEngine:
+    """Instância única do VisualizationEngine por processo"""
+    return VisualizationEngine()
+
+@lru_cache(maxsize=128)
+def _gauge_spec(value: float, title: str, min_value: float, max_value: float,
+                th_low: float, th_medium: float, th_high: float) -> dict:
+    """Spec do gauge memoizada: valor, título e faixas determinam a figura inteira"""
+    return get_viz_engine().create_gauge(
+        value, title, min_value, max_value,
+        thresholds={'low': th_low, 'medium': th_medium, 'high': th_high}
+    ).to_dict()
+
+def _gauge_figure(*args) -> go.Figure:
+    """Gauge a partir da spec cacheada; cada chamada recebe sua própria figura"""
+    return go.Figure(_gauge_spec(*args))
+
+@lru_cache(maxsize=32)
+def _radar_spec(categories: Tuple[str, ...],
+                values: Tuple[Tuple[str, Tuple[float, ...]], ...],
+                title: str) -> dict:
+    """Spec do radar memoizada; categorias e séries chegam como tuplas (hasheáveis)"""
+    return get_viz_engine().create_radar_chart(
+        list(categories), {name: list(data) for name, data in values}, title
+    ).to_dict()
+
+def _radar_figure(*args) -> go.Figure:
+    """Radar a partir da spec cacheada; cada chamada recebe sua própria figura"""
+    return go.Figure(_radar_spec(*args))
 
 def render_main_chart():
     """Renderiza o gráfico principal do dashboard"""
-    viz = VisualizationEngine()
+    viz = get_viz_engine()
     
     # Container principal
     with st.container():
@@ -419,24 +530,13 @@ def render_main_chart():
         
         with col3:
             if st.button("🔄 Atualizar", key="refresh_main_chart"):
+                for demo in (_demo_timeseries, _demo_heatmap, _demo_surface, _demo_hourly):
+                    demo.clear()
                 st.rerun()
         
         # Gerar visualização baseada na seleção
         if chart_type == "Série Temporal":
-            # Dados simulados
-            dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
-            data = []
-            
-            for region in ['Sudeste/CO', 'Sul', 'Nordeste', 'Norte']:
-                for date in dates:
-                    data.append({
-                        'date': date,
-                        'region': region,
-                        'value': np.random.normal(20000, 2000) if region == 'Sudeste/CO' 
-                                else np.random.normal(10000, 1000)
-                    })
-            
-            df = pd.DataFrame(data)
+            df = _demo_timeseries(data_source)
             
             fig = viz.create_time_series(
                 df, 
@@ -449,26 +549,11 @@ def render_main_chart():
             st.plotly_chart(fig, use_container_width=True)
         
         elif chart_type == "Mapa de Calor":
-            # Dados simulados para heatmap
-            hours = list(range(24))
-            days = pd.date_range(end=datetime.now(), periods=7, freq='D').strftime('%d/%m')
-            
-            data = []
-            for day in days:
-                for hour in hours:
-                    data.append({
-                        'dia': day,
-                        'hora': hour,
-                        'value': np.random.normal(70000, 5000) + (2000 if 14 <= hour <= 20 else 0)
-                    })
-            
-            df = pd.DataFrame(data)
+            df = _demo_heatmap(data_source)
             
             fig = viz.create_heatmap(
-                df,
-                f"Padrão de {data_source} - Semana",
-                x_label="Hora do Dia",
-                y_label="Data"
+                df, f"Padrão de {data_source} - Semana",
+                x_label="Hora do Dia", y_label="Data"
             )
             
             st.plotly_chart(fig, use_container_width=True)
@@ -500,8 +585,9 @@ def render_main_chart():
                 'Norte': [75, 80, 60, 92, 78, 68]
             }
             
-            fig = viz.create_radar_chart(
-                categories, values,
+            fig = _radar_figure(
+                tuple(categories),
+                tuple((name, tuple(data)) for name, data in values.items()),
                 "Análise Multidimensional por Subsistema"
             )
             
@@ -520,18 +606,7 @@ def render_main_chart():
             st.plotly_chart(fig, use_container_width=True)
         
         elif chart_type == "Superfície 3D":
-            # Dados 3D simulados
-            hours = list(range(24))
-            days = list(range(7))
-            
-            data = np.zeros((7, 24))
-            for i in days:
-                for j in hours:
-                    data[i, j] = np.random.normal(70000, 5000) + (3000 if 14 <= j <= 20 else 0)
-            
-            df = pd.DataFrame(data, 
-                            index=[f"Dia {i+1}" for i in days],
-                            columns=[f"{h:02d}:00" for h in hours])
+            df = _demo_surface(data_source)
             
             fig = viz.create_3d_surface(df, "Padrão de Carga Semanal - Visualização 3D")
             
@@ -566,7 +641,7 @@ def create_comparison_chart(data1: pd.DataFrame,
                            data2: pd.DataFrame,
                            title: str) -> go.Figure:
     """Cria gráfico de comparação entre dois períodos"""
-    viz = VisualizationEngine()
+    viz = get_viz_engine()
     
     fig = make_subplots(
         rows=2, cols=1,
@@ -576,8 +651,7 @@ def create_comparison_chart(data1: pd.DataFrame,
     )
     
     # Período atual
-    for region in data1['region'].unique():
-        region_data = data1[data1['region'] == region]
+    for region, region_data in data1.groupby('region', sort=False, observed=True):
         fig.add_trace(
             go.Scatter(
                 x=region_data['date'],
@@ -589,8 +663,7 @@ def create_comparison_chart(data1: pd.DataFrame,
         )
     
     # Período anterior
-    for region in data2['region'].unique():
-        region_data = data2[data2['region'] == region]
+    for region, region_data in data2.groupby('region', sort=False, observed=True):
         fig.add_trace(
             go.Scatter(
                 x=region_data['date'],
@@ -616,7 +689,7 @@ def create_comparison_chart(data1: pd.DataFrame,
 
 def render_mini_dashboard():
     """Renderiza um mini dashboard com múltiplos gráficos pequenos"""
-    viz = VisualizationEngine()
+    viz = get_viz_engine()
     
     st.markdown("### 🎯 Dashboard Compacto")
     
@@ -624,34 +697,19 @@ def render_mini_dashboard():
     
     with col1:
         # Gauge de eficiência
-        fig = viz.create_gauge(
-            value=87.5,
-            title="Eficiência do Sistema",
-            min_value=0,
-            max_value=100,
-            thresholds={'low': 60, 'medium': 80, 'high': 100}
-        )
+        fig = _gauge_figure(87.5, "Eficiência do Sistema", 0, 100, 60, 80, 100)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Gauge de reservatórios
-        fig = viz.create_gauge(
-            value=58.3,
-            title="Nível dos Reservatórios SE/CO",
-            min_value=0,
-            max_value=100,
-            thresholds={'low': 30, 'medium': 50, 'high': 100}
-        )
+        fig = _gauge_figure(58.3, "Nível dos Reservatórios SE/CO", 0, 100, 30, 50, 100)
         st.plotly_chart(fig, use_container_width=True)
     
     # Mini gráficos de linha
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        data = pd.DataFrame({
-            'x': range(24),
-            'y': np.random.normal(70000, 5000, 24)
-        })
+        data = _demo_hourly(70000, 5000)
         
         fig = px.area(data, x='x', y='y', 
                       title="Carga Últimas 24h",
@@ -663,10 +721,7 @@ def render_mini_dashboard():
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        data = pd.DataFrame({
-            'x': range(24),
-            'y': np.random.normal(150, 10, 24)
-        })
+        data = _demo_hourly(150, 10)
         
         fig = px.line(data, x='x', y='y',
                      title="CMO Médio 24h",
@@ -697,4 +752,4 @@ def render_mini_dashboard():
         st.plotly_chart(fig, use_container_width=True)
 
 # Exportar classes e funções
-__all__ = ['VisualizationEngine', 'render_main_chart', 'create_comparison_chart', 'render_mini_dashboard']
\ No newline at end of file
+__all__ = ['VisualizationEngine', 'get_viz_engine', 'render_main_chart', 'create_comparison_chart', 'render_mini_dashboard']
\ No newline at end of file
@@ -165,6 +165,8 @@ class ONSConfig:
     batch_size: int = int(os.getenv("ONS_BATCH_SIZE", "100"))
     max_retries: int = int(os.getenv("ONS_MAX_RETRIES", "3"))
     timeout: int = int(os.getenv("ONS_TIMEOUT", "60"))
+    max_concurrency: int = int(os.getenv("ONS_MAX_CONCURRENCY", "16"))
+    max_rate_limit_pause: float = float(os.getenv("ONS_MAX_RATE_LIMIT_PAUSE", "300"))
 
 # =================== Streamlit Configuration ===================
 
@@ -5,23 +5,138 @@ Gerencia comunicação com workflows de ingestão, chat e monitoramento.
 """
 
 import asyncio
+import contextvars
 import json
 import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List, Optional, Any, Union
-from functools import wraps
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Any, Union
+from functools import cached_property, wraps
 import os
 
 import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from cachetools import LRUCache, TTLCache, cached
+
+if TYPE_CHECKING:
+    import requests
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import orjson
+    _json_loads, _json_dumps = orjson.loads, orjson.dumps
+except ImportError:  # orjson é opcional; cai no json da stdlib
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prazo fim-a-fim (time.monotonic) compartilhado pelas chamadas do contexto atual
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("_deadline", default=None)
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Criar event loop, usando uvloop quando disponível."""
+    if UVLOOP_AVAILABLE:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+# Loop de fundo dos wrappers síncronos: criado uma vez e mantido numa thread
+# daemon, assim cada chamada só agenda a corrotina (e a sessão aiohttp em
+# cache continua presa a um loop vivo entre chamadas)
+_BG_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_BG_LOOP_LOCK = threading.Lock()
+
+# Folga sobre o timeout HTTP interno antes de desistir de esperar o resultado
+SYNC_TIMEOUT_SLACK = 5
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Obter (iniciando na primeira chamada) o event loop de fundo."""
+    global _BG_LOOP
+    with _BG_LOOP_LOCK:
+        if _BG_LOOP is None:
+            _BG_LOOP = _new_event_loop()
+            threading.Thread(
+                target=_BG_LOOP.run_forever, name="n8n-sync-loop", daemon=True
+            ).start()
+        return _BG_LOOP
+
+
+def _run_sync(coro, timeout: Optional[float] = None):
+    """Executar corrotina até o fim a partir de código síncrono."""
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+# Estados finais de execução (não mudam após atingidos) e tamanho do cache
+TERMINAL_EXECUTION_STATUSES = frozenset({"success", "error", "failed", "crashed", "canceled"})
+EXECUTION_CACHE_SIZE = 1024
+
+# Acima deste número de datasets a ingestão é enviada como NDJSON em streaming
+NDJSON_DATASET_THRESHOLD = 500
+
+# Respostas fallback por intenção, escolhidas com uma única busca de regex
+_FALLBACK_INTENT_RE = re.compile(
+    r"(?P<greet>\b(?:ol[aá]|oi|hello|bom dia|boa tarde|boa noite)\b)"
+    r"|(?P<help>\b(?:ajuda\w*|help|socorro)\b)",
+    re.IGNORECASE
+)
+_FALLBACK_RESPONSES = MappingProxyType({
+    "greet": "Olá! Sou o AIDE. No momento estou com dificuldades técnicas, mas em breve estarei disponível para ajudá-lo com dados do setor elétrico.",
+    "help": "Posso ajudar com análises de carga de energia, CMO/PLD, bandeiras tarifárias e outros dados do setor elétrico. Por favor, tente novamente em alguns instantes.",
+    "generic": "Desculpe, estou temporariamente indisponível. Por favor, tente novamente em alguns instantes."
+})
+
+# Relatório de saúde em memória: evita um GET no Redis a cada rerun do Streamlit
+HEALTH_CACHE_TTL = 5
+_HEALTH_CACHE = TTLCache(maxsize=1, ttl=HEALTH_CACHE_TTL)
+_HEALTH_LOCK = threading.Lock()
+
+
+@contextmanager
+def request_deadline(seconds: float):
+    """
+    Definir um prazo fim-a-fim para as chamadas n8n feitas dentro do bloco.
+    
+    Prazos aninhados nunca estendem o prazo externo.
+    
+    Exemplo:
+        with request_deadline(25):
+            service.process_chat_message_sync(msg, user_id)
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
 
 class WorkflowType(Enum):
     """Tipos de workflows disponíveis no n8n."""
@@ -31,6 +146,14 @@ class WorkflowType(Enum):
     BACKUP = "backup"
 
 
+# Webhook IDs dos workflows
+_WEBHOOK_IDS: Mapping[WorkflowType, str] = MappingProxyType({
+    WorkflowType.DATA_INGESTION: "aide-data-ingestion-manual",
+    WorkflowType.CHAT_PROCESSING: "aide-chat-processor",
+    WorkflowType.MONITORING: "aide-metrics-receiver"
+})
+
+
 class N8NConfig:
     """Configuração do n8n."""
     def __init__(self):
@@ -38,16 +161,19 @@ class N8NConfig:
         self.api_key = os.getenv("N8N_API_KEY", "")
         self.webhook_token = os.getenv("N8N_WEBHOOK_TOKEN", "")
         
-        # Webhook IDs dos workflows
-        self.webhooks = {
-            WorkflowType.DATA_INGESTION: "aide-data-ingestion-manual",
-            WorkflowType.CHAT_PROCESSING: "aide-chat-processor",
-            WorkflowType.MONITORING: "aide-metrics-receiver"
-        }
+        # Webhook IDs dos workflows (mapeamento imutável compartilhado)
+        self.webhooks = _WEBHOOK_IDS
         
         # Timeouts
         self.timeout = int(os.getenv("N8N_DEFAULT_TIMEOUT", "30"))
         self.max_retries = int(os.getenv("N8N_MAX_RETRIES", "3"))
+        
+        # Pool de conexões keep-alive da sessão assíncrona compartilhada
+        self.max_connections = int(os.getenv("N8N_MAX_CONNECTIONS", "100"))
+        self.keepalive_timeout = float(os.getenv("N8N_KEEPALIVE_TIMEOUT", "30"))
+        
+        # Limite de envios de telemetria em segundo plano
+        self.max_background_tasks = int(os.getenv("N8N_MAX_BACKGROUND_TASKS", "20"))
 
 
 class N8NService:
@@ -55,11 +181,23 @@ class N8NService:
     
     def __init__(self, config: Optional[N8NConfig] = None):
         self.config = config or N8NConfig()
-        self.session = self._create_session()
         self._async_session = None
+        self._bg_tasks: set = set()
+        self._bg_semaphore = asyncio.Semaphore(self.config.max_background_tasks)
+        self._status_semaphore = asyncio.Semaphore(self.config.max_background_tasks)
+        self._exec_cache: LRUCache = LRUCache(maxsize=EXECUTION_CACHE_SIZE)
         
-    def _create_session(self) -> requests.Session:
+    @cached_property
+    def session(self) -> "requests.Session":
+        """Sessão HTTP síncrona, criada apenas no primeiro uso."""
+        return self._create_session()
+    
+    def _create_session(self) -> "requests.Session":
         """Criar sessão HTTP com retry e configurações."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
         session = requests.Session()
         
         # Configurar retry strategy
@@ -97,9 +235,23 @@ class N8NService:
             if self.config.webhook_token:
                 headers["X-Webhook-Token"] = self.config.webhook_token
                 
-            self._async_session = aiohttp.ClientSession(headers=headers)
+            # Um pool para ingestão, métricas e chat: as conexões ficam
+            # abertas entre chamadas e o DNS é resolvido uma vez
+            connector = aiohttp.TCPConnector(
+                limit=self.config.max_connections,
+                keepalive_timeout=self.config.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._async_session = aiohttp.ClientSession(headers=headers, connector=connector)
         return self._async_session
     
+    def _timeout(self, budget: float) -> aiohttp.ClientTimeout:
+        """Timeout do salto atual, limitado pelo prazo fim-a-fim se houver."""
+        deadline = _deadline.get()
+        if deadline is not None:
+            budget = min(budget, deadline - time.monotonic())
+        return aiohttp.ClientTimeout(total=max(0.05, budget))
+    
     def _build_webhook_url(self, workflow_type: WorkflowType, path: str = "") -> str:
         """Construir URL completa do webhook."""
         webhook_id = self.config.webhooks.get(workflow_type)
@@ -142,24 +294,32 @@ class N8NService:
         """
         try:
             url = self._build_webhook_url(WorkflowType.DATA_INGESTION)
-            payload = {
-                "datasets": datasets,
+            header = {
                 "priority": priority,
                 "force_update": force_update,
                 "triggered_by": "python_service",
                 "timestamp": datetime.now().isoformat()
             }
             
+            # Listas grandes vão como NDJSON em streaming (uma linha por dataset)
+            if len(datasets) > NDJSON_DATASET_THRESHOLD:
+                request_kwargs = {
+                    "data": self._ndjson_body(header, datasets),
+                    "headers": {"Content-Type": "application/x-ndjson"},
+                }
+            else:
+                request_kwargs = {"json": {"datasets": datasets, **header}}
+            
             session = await self._get_async_session()
             async with session.post(
                 url, 
-                json=payload, 
-                timeout=self.config.timeout
+                timeout=self._timeout(self.config.timeout),
+                **request_kwargs
             ) as response:
                 result = await response.json()
                 
                 if response.status == 200:
-                    logger.info(f"Ingestão iniciada para datasets: {datasets}")
+                    logger.info(f"Ingestão iniciada para {len(datasets)} datasets")
                     return {
                         "success": True,
                         "execution_id": result.get("execution_id"),
@@ -181,9 +341,19 @@ class N8NService:
                 "error": str(e)
             }
     
+    @staticmethod
+    async def _ndjson_body(header: Dict[str, Any], datasets: List[str]):
+        """Gerar corpo NDJSON: cabeçalho na primeira linha e um dataset por linha."""
+        yield _json_dumps(header) + b"\n"
+        for dataset in datasets:
+            yield _json_dumps({"dataset": dataset}) + b"\n"
+    
     def trigger_data_ingestion_sync(self, datasets: List[str], **kwargs) -> Dict[str, Any]:
         """Versão síncrona do trigger_data_ingestion."""
-        return asyncio.run(self.trigger_data_ingestion(datasets, **kwargs))
+        return _run_sync(
+            self.trigger_data_ingestion(datasets, **kwargs),
+            timeout=self.config.timeout + SYNC_TIMEOUT_SLACK
+        )
     
     # ============= Chat Processing Methods =============
     
@@ -225,7 +395,7 @@ class N8NService:
             async with session.post(
                 url,
                 json=payload,
-                timeout=self.config.timeout + 20  # Timeout maior para IA
+                timeout=self._timeout(self.config.timeout + 20)  # Timeout maior para IA
             ) as response:
                 result = await response.json()
                 
@@ -257,18 +427,15 @@ class N8NService:
     
     def process_chat_message_sync(self, message: str, user_id: str, **kwargs) -> Dict[str, Any]:
         """Versão síncrona do process_chat_message."""
-        return asyncio.run(self.process_chat_message(message, user_id, **kwargs))
+        return _run_sync(
+            self.process_chat_message(message, user_id, **kwargs),
+            timeout=self.config.timeout + 20 + SYNC_TIMEOUT_SLACK
+        )
     
     def _generate_fallback_response(self, message: str) -> str:
         """Gerar resposta fallback para erros."""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["oi", "olá", "bom dia", "boa tarde", "boa noite"]):
-            return "Olá! Sou o AIDE. No momento estou com dificuldades técnicas, mas em breve estarei disponível para ajudá-lo com dados do setor elétrico."
-        elif "ajuda" in message_lower or "help" in message_lower:
-            return "Posso ajudar com análises de carga de energia, CMO/PLD, bandeiras tarifárias e outros dados do setor elétrico. Por favor, tente novamente em alguns instantes."
-        else:
-            return "Desculpe, estou temporariamente indisponível. Por favor, tente novamente em alguns instantes."
+        match = _FALLBACK_INTENT_RE.search(message)
+        return _FALLBACK_RESPONSES[match.lastgroup if match else "generic"]
     
     # ============= Monitoring Methods =============
     
@@ -289,7 +456,7 @@ class N8NService:
             async with session.post(
                 url,
                 json=metrics,
-                timeout=10
+                timeout=self._timeout(10)
             ) as response:
                 if response.status == 200:
                     logger.debug(f"Métricas enviadas: {metrics.get('workflow_name')}")
@@ -326,7 +493,7 @@ class N8NService:
             async with session.post(
                 url,
                 json=payload,
-                timeout=10
+                timeout=self._timeout(10)
             ) as response:
                 if response.status == 200:
                     logger.info(f"Alerta {severity} enviado: {alert_type}")
@@ -338,22 +505,84 @@ class N8NService:
             logger.error(f"Erro ao enviar alerta: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def get_system_health(self) -> Dict[str, Any]:
+    def _spawn(self, coro) -> asyncio.Task:
+        """Agendar corrotina em segundo plano mantendo referência até o fim."""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+        return task
+    
+    async def _bounded(self, coro) -> Dict[str, Any]:
+        """Executar corrotina respeitando o limite de envios simultâneos."""
+        async with self._bg_semaphore:
+            return await coro
+    
+    def send_metrics_nowait(self, metrics: Dict[str, Any]) -> asyncio.Task:
+        """
+        Enviar métricas sem aguardar a confirmação do n8n.
+        
+        Deve ser chamado dentro de um event loop em execução.
+        
+        Args:
+            metrics: Dicionário com métricas do sistema
+        
+        Returns:
+            Task agendada (pode ser ignorada pelo chamador)
+        """
+        return self._spawn(self._bounded(self.send_metrics(metrics)))
+    
+    def send_alert_nowait(self, severity: str, alert_type: str, details: Dict) -> asyncio.Task:
+        """
+        Enviar alerta sem aguardar a confirmação do n8n.
+        
+        Deve ser chamado dentro de um event loop em execução.
+        
+        Args:
+            severity: critical, high, medium, low
+            alert_type: Tipo do alerta
+            details: Detalhes do alerta
+        
+        Returns:
+            Task agendada (pode ser ignorada pelo chamador)
+        """
+        return self._spawn(self._bounded(self.send_alert(severity, alert_type, details)))
+    
+    def get_system_health(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Obter relatório de saúde do sistema do cache Redis.
         
+        O resultado fica em memória por HEALTH_CACHE_TTL segundos.
+        
+        Args:
+            force_refresh: Ignorar o cache em memória e consultar o Redis
+        
         Returns:
             Relatório de saúde com score e métricas
         """
+        if force_refresh:
+            health = self._fetch_system_health()
+            with _HEALTH_LOCK:
+                _HEALTH_CACHE["health:latest"] = health
+            return health
+        return self._cached_system_health()
+    
+    @cached(_HEALTH_CACHE, key=lambda *args: "health:latest", lock=_HEALTH_LOCK)
+    def _cached_system_health(self) -> Dict[str, Any]:
+        """Relatório de saúde passando pelo TTLCache do módulo."""
+        return self._fetch_system_health()
+    
+    def _fetch_system_health(self) -> Dict[str, Any]:
+        """Ler o relatório de saúde diretamente do Redis."""
         try:
             # Aqui você integraria com Redis para pegar o cache
             # Por enquanto, retorno simulado
             import redis
-            r = redis.Redis(host='localhost', port=6379, decode_responses=True)
+            # Bytes crus: o decoder JSON lê direto, sem passar por str
+            r = redis.Redis(host='localhost', port=6379)
             
             health_data = r.get("health:latest")
             if health_data:
-                return json.loads(health_data)
+                return _json_loads(health_data)
             else:
                 return self._get_default_health_report()
                 
@@ -387,7 +616,7 @@ class N8NService:
             url = f"{self.config.base_url}/api/v1/executions/{execution_id}"
             
             session = await self._get_async_session()
-            async with session.get(url, timeout=10) as response:
+            async with session.get(url, timeout=self._timeout(10)) as response:
                 if response.status == 200:
                     data = await response.json()
                     return {
@@ -408,6 +637,30 @@ class N8NService:
             logger.error(f"Erro ao verificar execução: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    async def get_execution_statuses(self, execution_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Verificar status de várias execuções concorrentemente.
+        
+        Execuções em estado terminal ficam em cache, pois não mudam mais.
+        
+        Args:
+            execution_ids: IDs das execuções
+        
+        Returns:
+            Status de cada execução, na mesma ordem dos IDs
+        """
+        async def fetch(execution_id: str) -> Dict[str, Any]:
+            cached = self._exec_cache.get(execution_id)
+            if cached is not None:
+                return cached
+            async with self._status_semaphore:
+                result = await self.get_execution_status(execution_id)
+            if result.get("status") in TERMINAL_EXECUTION_STATUSES:
+                self._exec_cache[execution_id] = result
+            return result
+        
+        return await asyncio.gather(*(fetch(i) for i in execution_ids))
+    
     def get_execution_history(
         self, 
         workflow_type: WorkflowType, 
@@ -432,9 +685,12 @@ class N8NService:
     
     async def close(self):
         """Fechar conexões."""
+        if self._bg_tasks:
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
         if self._async_session:
             await self._async_session.close()
-        self.session.close()
+        if "session" in self.__dict__:
+            self.session.close()
 
 
 # ============= Decoradores e Helpers =============
@@ -449,17 +705,22 @@ def n8n_webhook(workflow_type: WorkflowType):
             return {"processed": data}
     """
     def decorator(func):
+        service = None
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            service = get_n8n_service()
+            nonlocal service
             try:
                 # Executar função
                 result = await func(*args, **kwargs)
                 
-                # Enviar para n8n
-                if workflow_type == WorkflowType.DATA_INGESTION:
+                # Enviar para n8n apenas quando há datasets
+                datasets = result.get("datasets") if isinstance(result, dict) else None
+                if workflow_type is WorkflowType.DATA_INGESTION and datasets:
+                    if service is None:
+                        service = get_n8n_service()
                     await service.trigger_data_ingestion(
-                        datasets=result.get("datasets", []),
+                        datasets=datasets,
                         priority=result.get("priority", "normal")
                     )
                     
@@ -539,20 +800,83 @@ def check_system_health_streamlit() -> Dict[str, Any]:
 
 # ============= Classes de Resposta Tipadas =============
 
+# Somente leitura: usado apenas como fallback de consulta, nunca exposto
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+if MSGSPEC_AVAILABLE:
+    class _ChatPayloadStruct(msgspec.Struct, frozen=True):
+        """Conteúdo de ``response`` no payload do chat."""
+        text: str = ""
+        intent: Optional[str] = None
+        confidence: float = 0
+        visualization: Any = None
+        suggestions: List[Any] = msgspec.field(default_factory=list)
+        data: Any = None
+        metadata: Dict[str, Any] = msgspec.field(default_factory=dict)
+
+    class ChatResponseStruct(msgspec.Struct, frozen=True):
+        """Payload do workflow de chat decodificado diretamente dos bytes."""
+        success: bool = False
+        response: _ChatPayloadStruct = msgspec.field(default_factory=_ChatPayloadStruct)
+        error: Optional[str] = None
+
+    class HealthReportStruct(msgspec.Struct, frozen=True):
+        """Relatório de saúde decodificado diretamente dos bytes."""
+        health_score: float = 0
+        status: str = "unknown"
+        timestamp: Optional[str] = None
+        statistics: Dict[str, Any] = msgspec.field(default_factory=dict)
+        metrics_summary: List[Dict[str, Any]] = msgspec.field(default_factory=list)
+        recommendations: List[Any] = msgspec.field(default_factory=list)
+
+
 class ChatResponse:
     """Resposta estruturada do chat."""
     
+    __slots__ = (
+        "success", "text", "intent", "confidence", "visualization",
+        "suggestions", "data", "metadata", "error",
+    )
+    
     def __init__(self, data: Dict[str, Any]):
+        resp = data.get("response") or _EMPTY
         self.success = data.get("success", False)
-        self.text = data.get("response", {}).get("text", "")
-        self.intent = data.get("response", {}).get("intent")
-        self.confidence = data.get("response", {}).get("confidence", 0)
-        self.visualization = data.get("response", {}).get("visualization")
-        self.suggestions = data.get("response", {}).get("suggestions", [])
-        self.data = data.get("response", {}).get("data")
-        self.metadata = data.get("response", {}).get("metadata", {})
+        self.text = resp.get("text", "")
+        self.intent = resp.get("intent")
+        self.confidence = resp.get("confidence", 0)
+        self.visualization = resp.get("visualization")
+        self.suggestions = resp.get("suggestions", [])
+        self.data = resp.get("data")
+        self.metadata = resp.get("metadata") or {}
         self.error = data.get("error")
     
+    @classmethod
+    def from_json(cls, raw: Union[bytes, str]) -> "ChatResponse":
+        """
+        Construir resposta a partir do corpo JSON bruto.
+        
+        Usa msgspec quando disponível, evitando o dicionário intermediário.
+        """
+        if MSGSPEC_AVAILABLE:
+            try:
+                struct = msgspec.json.decode(raw, type=ChatResponseStruct)
+            except msgspec.ValidationError:
+                return cls(_json_loads(raw))
+            resp = struct.response
+            obj = cls.__new__(cls)
+            obj.success = struct.success
+            obj.text = resp.text
+            obj.intent = resp.intent
+            obj.confidence = resp.confidence
+            obj.visualization = resp.visualization
+            obj.suggestions = resp.suggestions
+            obj.data = resp.data
+            obj.metadata = resp.metadata
+            obj.error = struct.error
+            return obj
+        return cls(_json_loads(raw))
+    
     @property
     def has_visualization(self) -> bool:
         """Verificar se tem visualização."""
@@ -567,14 +891,41 @@ class ChatResponse:
 class HealthReport:
     """Relatório de saúde estruturado."""
     
+    __slots__ = (
+        "health_score", "status", "timestamp", "statistics",
+        "metrics", "recommendations",
+    )
+    
     def __init__(self, data: Dict[str, Any]):
         self.health_score = data.get("health_score", 0)
         self.status = data.get("status", "unknown")
         self.timestamp = data.get("timestamp")
-        self.statistics = data.get("statistics", {})
+        self.statistics = data.get("statistics") or {}
         self.metrics = data.get("metrics_summary", [])
         self.recommendations = data.get("recommendations", [])
     
+    @classmethod
+    def from_json(cls, raw: Union[bytes, str]) -> "HealthReport":
+        """
+        Construir relatório a partir do JSON bruto (ex.: cache Redis).
+        
+        Usa msgspec quando disponível, evitando o dicionário intermediário.
+        """
+        if MSGSPEC_AVAILABLE:
+            try:
+                struct = msgspec.json.decode(raw, type=HealthReportStruct)
+            except msgspec.ValidationError:
+                return cls(_json_loads(raw))
+            obj = cls.__new__(cls)
+            obj.health_score = struct.health_score
+            obj.status = struct.status
+            obj.timestamp = struct.timestamp
+            obj.statistics = struct.statistics
+            obj.metrics = struct.metrics_summary
+            obj.recommendations = struct.recommendations
+            return obj
+        return cls(_json_loads(raw))
+    
     @property
     def is_healthy(self) -> bool:
         """Sistema está saudável."""
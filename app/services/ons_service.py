@@ -7,19 +7,34 @@ import aiohttp
 import asyncio
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-import logging
-import json
 from functools import lru_cache
+import logging
+from email.utils import parsedate_to_datetime
 import hashlib
-from urllib.parse import urljoin, urlencode
-import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+try:
+    from lxml.etree import iterparse as etree_iterparse
+except ImportError:
+    from xml.etree.ElementTree import iterparse as etree_iterparse
 from io import StringIO, BytesIO
+import time
 import zipfile
-import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from cachetools import TTLCache
+
+try:
+    # orjson aceita bytes/str direto e é bem mais rápido que o json da stdlib
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 from models.database import Dataset, DataRecord, CargaEnergia, CMO
 from app.config import get_config
@@ -48,6 +63,42 @@ class ONSResponse:
     metadata: Dict[str, Any]
     error: Optional[str] = None
     raw_response: Optional[str] = None
+    
+    @property
+    def has_data(self) -> bool:
+        """Indica se a resposta foi bem-sucedida e contém registros"""
+        return self.success and self.data is not None and len(self.data) > 0
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Retorna os dados como DataFrame
+        
+        Respostas ficam no cache compartilhado do serviço, então o frame
+        guardado nunca é entregue diretamente: o chamador recebe uma cópia
+        e pode alterá-la à vontade.
+        """
+        if isinstance(self.data, pd.DataFrame):
+            return self.data.copy()
+        return pd.DataFrame(self.data)
+
+# Tipos das colunas categóricas conhecidas dos CSVs do ONS
+ONS_CSV_DTYPES = {
+    'id_subsistema': 'category',
+    'nom_subsistema': 'category'
+}
+
+class _ReplayStream:
+    """Stream assíncrono que reentrega os bytes já lidos antes do restante"""
+    
+    def __init__(self, head: bytes, stream: aiohttp.StreamReader):
+        self._head = head
+        self._stream = stream
+    
+    async def read(self, n: int = -1) -> bytes:
+        if self._head:
+            chunk, self._head = self._head, b''
+            return chunk
+        return await self._stream.read(n)
 
 class ONSService:
     """Serviço de integração com ONS"""
@@ -106,9 +157,117 @@ class ONSService:
             'X-API-Key': self.api_key
         }
         
-        # Cache de datasets
-        self.datasets_cache = {}
+        # Cache de datasets (limitado em tamanho e com expiração real)
         self.cache_ttl = 3600  # 1 hora
+        self.datasets_cache = TTLCache(maxsize=512, ttl=self.cache_ttl)
+        
+        # Requisições em andamento, para que chamadas idênticas compartilhem o resultado
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        
+        # Índices dataset -> endpoint/categoria (consulta O(1))
+        self._endpoint_index: Dict[str, str] = {}
+        self._category_index: Dict[str, str] = {}
+        for category, endpoints in self.ENDPOINTS.items():
+            for key, endpoint in endpoints.items():
+                self._endpoint_index.setdefault(key, endpoint)
+                self._category_index.setdefault(key, category)
+            for endpoint in endpoints.values():
+                self._endpoint_index.setdefault(endpoint, endpoint)
+        
+        # URLs completas pré-calculadas por endpoint
+        self._url_index: Dict[str, str] = {
+            endpoint: urljoin(self.base_url, endpoint)
+            for endpoint in set(self._endpoint_index.values())
+        }
+        
+        # Sessão HTTP compartilhada (criada sob demanda)
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Limite de requisições simultâneas e pausa pedida pelo servidor
+        self._sem = asyncio.Semaphore(config.ons.max_concurrency or 16)
+        self._paused_until = 0.0
+        self._max_pause = config.ons.max_rate_limit_pause
+    
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Obtém a sessão HTTP compartilhada, criando-a se necessário"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=128,
+                    limit_per_host=64,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                ),
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+    
+    def _update_rate_limit(self, response: aiohttp.ClientResponse):
+        """Registra pausa quando o servidor indica limite de requisições esgotado"""
+        headers = response.headers
+        delay = None
+        
+        if 'Retry-After' in headers:
+            delay = self._parse_retry_after(headers['Retry-After'])
+        elif headers.get('X-RateLimit-Remaining') == '0':
+            delay = self._parse_retry_after(headers.get('X-RateLimit-Reset', '1'))
+        
+        if delay:
+            delay = min(delay, self._max_pause)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+    
+    @staticmethod
+    def _parse_retry_after(value: str) -> float:
+        """
+        Converte Retry-After/X-RateLimit-Reset em atraso (segundos)
+        
+        Aceita segundos, epoch Unix (valores acima de 1e9, comum no
+        X-RateLimit-Reset) ou HTTP-date.
+        """
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            pass
+        else:
+            if seconds > 1e9:
+                seconds -= time.time()
+            return max(0.0, seconds)
+        
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 1.0
+    
+    async def _wait_rate_limit(self):
+        """Aguarda o fim de uma pausa de rate limit, se houver"""
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    async def _read_json(self, response: aiohttp.ClientResponse) -> Any:
+        """
+        Lê corpo JSON da resposta
+        
+        Arrays no topo são parseados incrementalmente com ijson (quando
+        disponível), sem bufferizar o corpo inteiro nem a árvore intermediária.
+        """
+        if not IJSON_AVAILABLE:
+            return await response.json()
+        
+        head = await response.content.read(1024)
+        if not head.lstrip().startswith(b'['):
+            return json_loads(head + await response.content.read())
+        
+        stream = _ReplayStream(head, response.content)
+        return [item async for item in ijson.items_async(stream, 'item', use_float=True)]
+    
+    async def close(self):
+        """Fecha a sessão HTTP compartilhada"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
         
     # =================== Métodos Principais ===================
     
@@ -120,6 +279,9 @@ class ONSService:
         """
         Busca dados de um dataset específico
         
+        Respostas bem-sucedidas ficam em cache por ``cache_ttl`` segundos e
+        chamadas concorrentes idênticas aguardam a mesma requisição.
+        
         Args:
             dataset_id: ID do dataset
             start_date: Data inicial
@@ -129,6 +291,88 @@ class ONSService:
         Returns:
             Resposta com os dados
         """
+        key = self._cache_key(dataset_id, start_date, end_date, kwargs)
+        
+        cached = self.datasets_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # A requisição roda numa task própria e todos (inclusive quem a criou)
+        # aguardam via shield: cancelar um chamador não afeta os demais
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch_and_cache(key, dataset_id, start_date, end_date, **kwargs)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight_done(key, t))
+        return await asyncio.shield(task)
+    
+    async def _fetch_and_cache(self, key: Tuple, dataset_id: str,
+                               start_date: Optional[datetime],
+                               end_date: Optional[datetime],
+                               **kwargs) -> ONSResponse:
+        """Executa a busca compartilhada e guarda respostas bem-sucedidas"""
+        response = await self._fetch_dataset(dataset_id, start_date, end_date, **kwargs)
+        if response.success:
+            self.datasets_cache[key] = response
+        return response
+    
+    def _inflight_done(self, key: Tuple, task: asyncio.Task):
+        """Remove a requisição concluída do registro de requisições em andamento"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Evitar aviso de exceção não recuperada quando ninguém mais aguarda
+        if not task.cancelled():
+            task.exception()
+    
+    async def fetch_many(self, specs: List[Dict[str, Any]]) -> List[ONSResponse]:
+        """
+        Busca vários datasets concorrentemente
+        
+        Ponto de entrada preferido para cargas em lote: as requisições se
+        sobrepõem, respeitando o limite de concorrência do serviço.
+        
+        Args:
+            specs: Lista de kwargs para ``fetch_dataset``
+                (ex.: ``{'dataset_id': 'cmo/semanal', 'start_date': ...}``)
+            
+        Returns:
+            Respostas na mesma ordem de ``specs``
+        """
+        results = await asyncio.gather(
+            *(self.fetch_dataset(**spec) for spec in specs),
+            return_exceptions=True
+        )
+        
+        return [
+            result if isinstance(result, ONSResponse) else ONSResponse(
+                success=False,
+                data=None,
+                metadata={'dataset_id': spec.get('dataset_id')},
+                error=str(result)
+            )
+            for spec, result in zip(specs, results)
+        ]
+    
+    @staticmethod
+    def _cache_key(dataset_id: str,
+                   start_date: Optional[datetime],
+                   end_date: Optional[datetime],
+                   params: Dict) -> Tuple:
+        """Monta chave hashable para cache/deduplicação de requisições"""
+        items = tuple(sorted(
+            (k, tuple(v) if isinstance(v, list) else v)
+            for k, v in params.items()
+        ))
+        return (dataset_id, start_date, end_date, items)
+    
+    async def _fetch_dataset(self,
+                             dataset_id: str,
+                             start_date: Optional[datetime] = None,
+                             end_date: Optional[datetime] = None,
+                             **kwargs) -> ONSResponse:
+        """Executa a requisição de um dataset, sem cache"""
         try:
             # Determinar endpoint
             endpoint = self._get_endpoint(dataset_id)
@@ -144,22 +388,20 @@ class ONSService:
             params = self._prepare_params(start_date, end_date, **kwargs)
             
             # Fazer requisição
-            async with aiohttp.ClientSession() as session:
-                url = urljoin(self.base_url, endpoint)
-                
-                async with session.get(
-                    url,
-                    params=params,
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
+            session = await self._ensure_session()
+            url = self._url_index.get(endpoint) or urljoin(self.base_url, endpoint)
+            
+            async with self._sem:
+                await self._wait_rate_limit()
+                async with session.get(url, params=params) as response:
+                    self._update_rate_limit(response)
                     
                     if response.status == 200:
                         # Processar resposta baseado no formato
                         content_type = response.headers.get('Content-Type', '')
                         
                         if 'json' in content_type:
-                            data = await response.json()
+                            data = await self._read_json(response)
                         elif 'csv' in content_type:
                             text = await response.text()
                             data = self._parse_csv(text)
@@ -177,7 +419,7 @@ class ONSService:
                             data=processed_data,
                             metadata={
                                 'dataset_id': dataset_id,
-                                'records_count': len(processed_data) if isinstance(processed_data, list) else 1,
+                                'records_count': len(processed_data) if isinstance(processed_data, (list, pd.DataFrame)) else 1,
                                 'start_date': start_date.isoformat() if start_date else None,
                                 'end_date': end_date.isoformat() if end_date else None
                             }
@@ -190,7 +432,7 @@ class ONSService:
                             metadata={'status_code': response.status},
                             error=f"HTTP {response.status}: {error_text}"
                         )
-                        
+                    
         except asyncio.TimeoutError:
             return ONSResponse(
                 success=False,
@@ -239,9 +481,9 @@ class ONSService:
             subsistemas=subsystems
         )
         
-        if response.success and response.data:
+        if response.has_data:
             # Converter para DataFrame
-            df = pd.DataFrame(response.data)
+            df = response.to_frame()
             
             # Padronizar colunas
             column_mapping = {
@@ -253,13 +495,22 @@ class ONSService:
             
             df = df.rename(columns=column_mapping)
             
-            # Converter timestamp
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
+            # Filtrar por subsistemas antes das conversões (menos linhas a converter);
+            # como categoria, o isin compara códigos inteiros
+            if 'subsystem' in df.columns:
+                df['subsystem'] = df['subsystem'].astype('category')
+                if subsystems:
+                    df = df[df['subsystem'].isin(subsystems)].copy()
             
-            # Filtrar por subsistemas se especificado
-            if subsystems and 'subsystem' in df.columns:
-                df = df[df['subsystem'].isin(subsystems)]
+            # Converter timestamp (cache reaproveita strings repetidas)
+            if 'timestamp' in df.columns:
+                df['timestamp'] = pd.to_datetime(
+                    df['timestamp'], cache=True, format='ISO8601', errors='coerce'
+                )
+                invalidos = df['timestamp'].isna()
+                if invalidos.any():
+                    logger.warning(f"{int(invalidos.sum())} registros de carga com timestamp inválido descartados")
+                    df = df[~invalidos]
             
             return df
         
@@ -296,8 +547,8 @@ class ONSService:
             end_date
         )
         
-        if response.success and response.data:
-            df = pd.DataFrame(response.data)
+        if response.has_data:
+            df = response.to_frame()
             
             # Padronizar colunas
             column_mapping = {
@@ -339,19 +590,16 @@ class ONSService:
             fontes=sources
         )
         
-        if response.success and response.data:
-            # Processar dados por fonte
-            generation = {}
+        if response.has_data:
+            # Agregar geração por fonte
+            df = response.to_frame()
             
-            for record in response.data:
-                source = record.get('fonte_geracao', 'unknown')
-                value = record.get('val_geracao_mw', 0)
-                
-                if source not in generation:
-                    generation[source] = 0
-                generation[source] += value
+            sources_col = df['fonte_geracao'].fillna('unknown') if 'fonte_geracao' in df.columns \
+                else pd.Series('unknown', index=df.index)
+            values = pd.to_numeric(df['val_geracao_mw'], errors='coerce').fillna(0) \
+                if 'val_geracao_mw' in df.columns else pd.Series(0, index=df.index)
             
-            return generation
+            return values.groupby(sources_col, sort=False, observed=True).sum().to_dict()
         
         return {}
     
@@ -378,8 +626,8 @@ class ONSService:
             subsistemas=subsystems
         )
         
-        if response.success and response.data:
-            df = pd.DataFrame(response.data)
+        if response.has_data:
+            df = response.to_frame()
             
             # Padronizar colunas
             column_mapping = {
@@ -400,7 +648,7 @@ class ONSService:
     
     # =================== Métodos de Processamento ===================
     
-    def _process_dataset_data(self, dataset_id: str, raw_data: Any) -> List[Dict]:
+    def _process_dataset_data(self, dataset_id: str, raw_data: Any) -> Union[pd.DataFrame, List[Dict]]:
         """
         Processa dados brutos do dataset
         
@@ -409,86 +657,126 @@ class ONSService:
             raw_data: Dados brutos
             
         Returns:
-            Lista de registros processados
+            DataFrame com os registros (ou lista, para formatos não tabulares)
         """
+        # Se já for DataFrame, retornar sem conversão
+        if isinstance(raw_data, pd.DataFrame):
+            return raw_data
+        
         if not raw_data:
-            return []
+            return pd.DataFrame()
         
-        # Se já for uma lista de dicionários, retornar
+        # Lista de dicionários: construir colunas uma única vez
         if isinstance(raw_data, list) and all(isinstance(item, dict) for item in raw_data):
-            return raw_data
-        
-        # Se for DataFrame, converter para lista de dicts
-        if isinstance(raw_data, pd.DataFrame):
-            return raw_data.to_dict('records')
+            return pd.DataFrame.from_records(raw_data)
         
         # Se for string (CSV ou JSON), processar
         if isinstance(raw_data, str):
             try:
                 # Tentar JSON primeiro
-                return json.loads(raw_data)
-            except:
+                return self._process_dataset_data(dataset_id, json_loads(raw_data))
+            except ValueError:
                 # Tentar CSV
                 return self._parse_csv(raw_data)
         
         # Se for bytes (arquivo binário), processar
         if isinstance(raw_data, bytes):
-            return self._process_binary_data(raw_data)
+            return self._process_dataset_data(dataset_id, self._process_binary_data(raw_data))
+        
+        if isinstance(raw_data, list):
+            return raw_data
         
         return [{'data': raw_data}]
     
-    def _parse_csv(self, csv_text: str) -> List[Dict]:
-        """Parse CSV para lista de dicionários"""
+    def _read_csv(self, source) -> pd.DataFrame:
+        """Lê CSV com a engine pyarrow, caindo para a engine C com dtypes conhecidos"""
+        try:
+            df = pd.read_csv(source, engine='pyarrow')
+        except (ImportError, ValueError):
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            df = pd.read_csv(
+                source,
+                engine='c',
+                low_memory=False,
+                dtype=ONS_CSV_DTYPES
+            )
+        
+        if 'din_instante' in df.columns and df['din_instante'].dtype == object:
+            df['din_instante'] = pd.to_datetime(df['din_instante'], cache=True, errors='coerce')
+        
+        return df
+    
+    def _parse_csv(self, csv_text: str) -> pd.DataFrame:
+        """Parse CSV para DataFrame"""
         try:
-            df = pd.read_csv(StringIO(csv_text))
-            return df.to_dict('records')
+            return self._read_csv(StringIO(csv_text))
         except Exception as e:
             logger.error(f"Erro ao parsear CSV: {e}")
-            return []
+            return pd.DataFrame()
     
     def _parse_xml(self, xml_text: str) -> List[Dict]:
         """Parse XML para lista de dicionários"""
         try:
-            root = ET.fromstring(xml_text)
             records = []
+            depth = 0
+            root = None
             
-            for child in root:
-                record = {}
-                for element in child:
-                    record[element.tag] = element.text
-                records.append(record)
+            # Streaming: cada registro (filho da raiz) é lido e descartado em seguida
+            source = BytesIO(xml_text.encode('utf-8') if isinstance(xml_text, str) else xml_text)
+            for event, elem in etree_iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    depth += 1
+                    continue
+                
+                depth -= 1
+                if depth == 1:
+                    records.append({element.tag: element.text for element in elem})
+                    elem.clear()
+                    root.clear()
             
             return records
         except Exception as e:
             logger.error(f"Erro ao parsear XML: {e}")
             return []
     
-    def _process_binary_data(self, data: bytes) -> List[Dict]:
+    def _process_binary_data(self, data: bytes) -> Union[pd.DataFrame, List[Dict]]:
         """Processa dados binários (ZIP, Excel, etc)"""
         try:
             # Tentar como ZIP
             with zipfile.ZipFile(BytesIO(data)) as zf:
+                frames = []
                 records = []
-                for filename in zf.namelist():
+                for info in zf.infolist():
+                    filename = info.filename
                     if filename.endswith('.csv'):
-                        with zf.open(filename) as f:
-                            df = pd.read_csv(f)
-                            records.extend(df.to_dict('records'))
+                        # Cada membro é descomprimido direto do stream para o parser
+                        with zf.open(info) as f:
+                            frames.append(self._read_csv(f))
                     elif filename.endswith('.json'):
-                        with zf.open(filename) as f:
-                            content = json.load(f)
+                        with zf.open(info) as f:
+                            content = json_loads(f.read())
                             if isinstance(content, list):
                                 records.extend(content)
                             else:
                                 records.append(content)
+                
+                # Apenas CSVs: devolver o DataFrame sem passar por registros
+                if frames:
+                    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                    frames.clear()
+                    if not records:
+                        return df
+                    records = df.to_dict('records') + records
                 return records
         except:
             pass
         
         try:
             # Tentar como Excel
-            df = pd.read_excel(BytesIO(data))
-            return df.to_dict('records')
+            return pd.read_excel(BytesIO(data))
         except:
             pass
         
@@ -498,18 +786,8 @@ class ONSService:
     
     def _get_endpoint(self, dataset_id: str) -> Optional[str]:
         """Obtém endpoint para um dataset"""
-        # Verificar endpoints conhecidos
-        for category, endpoints in self.ENDPOINTS.items():
-            if dataset_id in endpoints:
-                return endpoints[dataset_id]
-            
-            # Verificar se o dataset_id é um endpoint direto
-            for endpoint_key, endpoint_value in endpoints.items():
-                if endpoint_value == dataset_id:
-                    return endpoint_value
-        
-        # Se não encontrar, assumir que é um path direto
-        return dataset_id
+        # Se não for conhecido, assumir que é um path direto
+        return self._endpoint_index.get(dataset_id, dataset_id)
     
     def _prepare_params(self,
                        start_date: Optional[datetime],
@@ -529,31 +807,52 @@ class ONSService:
         for key, value in kwargs.items():
             if value is not None:
                 if isinstance(value, list):
-                    params[key] = ','.join(str(v) for v in value)
+                    params[key] = ','.join(map(str, value))
                 else:
                     params[key] = value
         
         return params
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def _fetch_with_retry(self, url: str, params: Dict) -> Dict:
-        """Fetch com retry automático"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, headers=self.headers) as response:
-                response.raise_for_status()
-                return await response.json()
+        """
+        Fetch com retry guiado pelo servidor
+        
+        429/503 aguardam o tempo indicado em Retry-After/X-RateLimit-Reset;
+        demais 5xx e falhas de rede/timeout usam backoff exponencial
+        limitado; outros 4xx falham na hora.
+        """
+        session = await self._ensure_session()
+        max_attempts = max(1, config.ons.max_retries)
+        
+        for attempt in range(1, max_attempts + 1):
+            async with self._sem:
+                await self._wait_rate_limit()
+                try:
+                    async with session.get(url, params=params) as response:
+                        self._update_rate_limit(response)
+                        
+                        if response.status < 400:
+                            return await response.json()
+                        
+                        retryable = response.status == 429 or response.status >= 500
+                        if not retryable or attempt == max_attempts:
+                            response.raise_for_status()
+                except aiohttp.ClientResponseError:
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == max_attempts:
+                        raise
+                    logger.warning(f"Falha transitória em {url} (tentativa {attempt}): {e}")
+            
+            # Sem indicação do servidor: backoff exponencial
+            if self._paused_until <= time.monotonic():
+                await asyncio.sleep(min(10, 2 ** attempt))
     
     # =================== Métodos de Cache ===================
     
-    @lru_cache(maxsize=100)
-    def _get_cached_endpoint(self, dataset_id: str) -> Optional[str]:
-        """Cache de endpoints"""
-        return self._get_endpoint(dataset_id)
-    
     def clear_cache(self):
         """Limpa cache"""
         self.datasets_cache.clear()
-        self._get_cached_endpoint.cache_clear()
     
     # =================== Métodos de Validação ===================
     
@@ -584,28 +883,29 @@ class ONSService:
             return None
         
         # Encontrar categoria
-        category = None
-        for cat, endpoints in self.ENDPOINTS.items():
-            if dataset_id in endpoints:
-                category = cat
-                break
+        category = self._category_index.get(dataset_id)
         
         return ONSDataset(
             id=dataset_id,
             name=dataset_id.replace('_', ' ').title(),
             description=f"Dataset {dataset_id} from ONS",
-            url=urljoin(self.base_url, endpoint),
+            url=self._url_index.get(endpoint) or urljoin(self.base_url, endpoint),
             format='json',
             update_frequency='daily' if 'diaria' in endpoint else 'hourly'
         )
 
 # =================== Funções Helper ===================
 
+@lru_cache(maxsize=1)
 def get_ons_service() -> ONSService:
     """Retorna instância singleton do serviço ONS"""
-    if 'ons_service' not in globals():
-        globals()['ons_service'] = ONSService()
-    return globals()['ons_service']
+    return ONSService()
+
+async def reset_ons_service():
+    """Fecha e descarta a instância singleton (útil em testes e no shutdown)"""
+    if get_ons_service.cache_info().currsize:
+        await get_ons_service().close()
+    get_ons_service.cache_clear()
 
 async def fetch_latest_data(dataset_id: str, hours: int = 24) -> pd.DataFrame:
     """
@@ -625,8 +925,8 @@ async def fetch_latest_data(dataset_id: str, hours: int = 24) -> pd.DataFrame:
     
     response = await service.fetch_dataset(dataset_id, start_date, end_date)
     
-    if response.success and response.data:
-        return pd.DataFrame(response.data)
+    if response.has_data:
+        return response.to_frame()
     
     return pd.DataFrame()
 
@@ -1,12 +1,25 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import numpy as np
 from pathlib import Path
 from datetime import datetime
 import os
 import logging
+import shutil
 from tqdm import tqdm
+from tqdm.utils import CallbackIOWrapper
 import traceback
+import json
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson é opcional; cai no json da stdlib
+    _json_loads = json.loads
 
 # 🔹 Diretório base de saída
 OUTPUT_DIR = Path(__file__).parent / "dados_ons"
@@ -58,6 +71,84 @@ DATASETS = {
 # CKAN API base
 CKAN_API = "https://dados.ons.org.br/api/3/action/package_show?id="
 
+# Downloads simultâneos de recursos dentro de um dataset CKAN
+MAX_RECURSOS_PARALELOS = 8
+
+# Sessão compartilhada entre threads (reaproveita conexões TCP/TLS)
+SESSION = requests.Session()
+# Retry com backoff em erros transitórios (429/5xx) antes de abortar o dataset
+_RETRY = Retry(total=3, backoff_factor=0.5,
+               status_forcelist=[429, 500, 502, 503, 504],
+               allowed_methods=["GET", "HEAD"])
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=_RETRY))
+
+# Um lock por arquivo de saída para appends concorrentes
+_csv_locks = {}
+_csv_locks_guard = threading.Lock()
+
+def _lock_arquivo(path):
+    with _csv_locks_guard:
+        return _csv_locks.setdefault(path, threading.Lock())
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+def _converter_parquet(dest):
+    """Gera uma cópia Parquet (zstd, colunar) ao lado do CSV baixado.
+
+    O CSV é mantido porque os scripts de importação ainda leem *.csv;
+    leitores que aceitam Parquet evitam reprocessar o texto.
+    """
+    if not PYARROW_AVAILABLE or dest.suffix.lower() != ".csv":
+        return None
+    with open(dest, "r", encoding="utf-8-sig", errors="replace") as f:
+        cabecalho = f.readline()
+    delimitador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+    parquet = dest.with_suffix(".parquet")
+    try:
+        tabela = pa_csv.read_csv(
+            dest,
+            read_options=pa_csv.ReadOptions(block_size=1 << 24),
+            parse_options=pa_csv.ParseOptions(delimiter=delimitador),
+        )
+        pq.write_table(tabela, parquet, compression="zstd", use_dictionary=True)
+    except (pa.ArrowInvalid, OSError) as e:
+        logging.warning(f"   ⚠️ conversão para Parquet falhou em {dest}: {e}")
+        return None
+    logging.info(f"   📦 Parquet salvo em {parquet}")
+    return parquet
+
+# Validadores HTTP (ETag/Last-Modified) por URL, para revalidar recursos CKAN
+ETAGS_FILE = OUTPUT_DIR / "_etags.json"
+_etags_lock = threading.Lock()
+
+def _carregar_etags():
+    if ETAGS_FILE.exists():
+        try:
+            return _json_loads(ETAGS_FILE.read_bytes())
+        except ValueError:
+            logging.warning(f"⚠️ {ETAGS_FILE} inválido, ignorando cache de ETags")
+    return {}
+
+_etags = _carregar_etags()
+
+def _registrar_etag(url, headers):
+    """Guarda ETag/Last-Modified de um recurso baixado e persiste o cache."""
+    with _etags_lock:
+        _etags[url] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "size": int(headers.get("content-length", 0)),
+        }
+        tmp = ETAGS_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_etags, indent=2), encoding="utf-8")
+        tmp.replace(ETAGS_FILE)
+
 # ==========================================================
 # Funções auxiliares
 # ==========================================================
@@ -69,74 +160,161 @@ def baixar_api(dataset, config, data_inicio=DATA_INICIO, data_fim=DATA_FIM):
     params["dat_fim"] = data_fim
 
     logging.info(f"🔹 API: {dataset} {params}")
-    resp = requests.get(url, params=params, timeout=60)
+    resp = SESSION.get(url, params=params, timeout=60)
     resp.raise_for_status()
-    dados = resp.json()
+    dados = _json_loads(resp.content)
 
     if not dados:
         logging.warning(f"⚠️ Nenhum dado retornado para {dataset}")
         return None
 
-    return pd.DataFrame(dados)
+    return pd.DataFrame.from_records(dados)
+
+def _baixar_recurso(dataset, r, position=0):
+    """Baixa um recurso CKAN para OUTPUT_DIR/dataset (pula se já existir)."""
+    url_recurso = r.get("url")
+    if not url_recurso:
+        return None
+    nome = r.get("name") or Path(url_recurso).name
+
+    logging.info(f"🔹 CKAN: {dataset} -> {url_recurso}")
+    outdir = OUTPUT_DIR / dataset
+    outdir.mkdir(exist_ok=True)
+    dest = outdir / nome
+
+    # identity: arquivo chega como está, sem descompressão gzip na CPU
+    headers = {"Accept-Encoding": "identity"}
+    if dest.exists():
+        cache = _etags.get(url_recurso)
+        if not cache or not (cache.get("etag") or cache.get("last_modified")):
+            logging.info(f"   ⏩ já existe, pulando {dest}")
+            return None
+        # Revalidação condicional: servidor responde 304 sem corpo se nada mudou
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    r2 = SESSION.get(url_recurso, stream=True, timeout=300, headers=headers)
+    if r2.status_code == 304:
+        r2.close()
+        logging.info(f"   ⏩ inalterado no servidor (304), pulando {dest}")
+        return None
+    r2.raise_for_status()
+    r2.raw.decode_content = True
+    total = int(r2.headers.get('content-length', 0))
+    # Baixa para .part e só troca no fim: uma falha no meio não deixa o
+    # arquivo truncado no lugar (com a ETag antiga valendo para sempre)
+    parcial = dest.with_suffix(dest.suffix + ".part")
+    try:
+        _copiar_com_progresso(r2, parcial, nome, total, position)
+    except BaseException:
+        parcial.unlink(missing_ok=True)
+        raise
+    os.replace(parcial, dest)
+
+    _registrar_etag(url_recurso, r2.headers)
+    _converter_parquet(dest)
+    logging.info(f"   ✅ salvo em {dest}")
+    return dest
+
+def _copiar_com_progresso(r2, caminho, nome, total, position):
+    """Grava o corpo da resposta em `caminho` com barra de progresso."""
+    with open(caminho, "wb") as f, tqdm(
+        desc=f"Baixando {nome}",
+        total=total,
+        unit='B',
+        unit_scale=True,
+        unit_divisor=1024,
+        position=position,
+        leave=False
+    ) as bar:
+        # Cópia em blocos de 1 MiB feita por shutil, progresso via wrapper
+        shutil.copyfileobj(CallbackIOWrapper(bar.update, r2.raw, "read"), f, length=1 << 20)
+        if total and f.tell() != total:
+            raise IOError(f"download incompleto de {nome}: {f.tell()} de {total} bytes")
 
 def baixar_ckan(dataset):
     """Consulta CKAN e baixa todos os recursos associados a um dataset."""
     url = CKAN_API + dataset
-    resp = requests.get(url, timeout=60)
+    resp = SESSION.get(url, timeout=60)
     resp.raise_for_status()
-    result = resp.json()["result"]
+    result = _json_loads(resp.content)["result"]
 
     recursos = result.get("resources", [])
-    arquivos = []
+    if not recursos:
+        return []
 
-    for r in recursos:
-        url_recurso = r.get("url")
-        nome = r.get("name") or Path(url_recurso).name
-        if not url_recurso:
-            continue
-
-        logging.info(f"🔹 CKAN: {dataset} -> {url_recurso}")
-        outdir = OUTPUT_DIR / dataset
-        outdir.mkdir(exist_ok=True)
-        dest = outdir / nome
-
-        if dest.exists():
-            logging.info(f"   ⏩ já existe, pulando {dest}")
-            continue
-
-        r2 = requests.get(url_recurso, stream=True, timeout=300)
-        r2.raise_for_status()
-        total = int(r2.headers.get('content-length', 0))
-        with open(dest, "wb") as f, tqdm(
-            desc=f"Baixando {nome}",
-            total=total,
-            unit='B',
-            unit_scale=True,
-            unit_divisor=1024
-        ) as bar:
-            for chunk in r2.iter_content(1024*1024):
-                f.write(chunk)
-                bar.update(len(chunk))
-
-        arquivos.append(dest)
-        logging.info(f"   ✅ salvo em {dest}")
+    # Recursos baixados em paralelo (I/O de rede domina)
+    with ThreadPoolExecutor(max_workers=min(MAX_RECURSOS_PARALELOS, len(recursos))) as executor:
+        futures = [
+            executor.submit(_baixar_recurso, dataset, r, i % MAX_RECURSOS_PARALELOS)
+            for i, r in enumerate(recursos)
+        ]
+        arquivos = [dest for dest in (f.result() for f in futures) if dest is not None]
 
     return arquivos
 
+def _hash_linhas(df):
+    """Hash estável (independe do processo) dos valores de cada linha."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
 def salvar_csv(dataset, df, area="BR"):
-    """Concatena dados novos a um CSV existente (sem duplicar)."""
+    """Acrescenta dados novos a um CSV existente (sem duplicar).
+
+    As linhas já gravadas são identificadas por hash dos valores e
+    guardadas em um arquivo .rowhash.npy ao lado do CSV, então cada chamada
+    custa O(linhas novas) em vez de reler e regravar o arquivo inteiro.
+    As colunas são alinhadas pelo cabeçalho do arquivo; se o conjunto de
+    colunas mudar, o CSV é regravado inteiro (como um concat).
+    """
     outdir = OUTPUT_DIR / dataset
     outdir.mkdir(exist_ok=True)
     csv_file = outdir / f"{dataset}_{area}_2024_2025.csv"
+    # Nome novo: os .keys.npy antigos eram hashes do texto e não batem mais
+    keys_file = csv_file.with_suffix(".rowhash.npy")
+
+    with _lock_arquivo(csv_file):
+        if csv_file.exists():
+            cabecalho = list(pd.read_csv(csv_file, nrows=0, encoding="utf-8-sig").columns)
+            if sorted(cabecalho) != sorted(map(str, df.columns)):
+                _regravar_csv(csv_file, keys_file, pd.concat([pd.read_csv(csv_file, encoding="utf-8-sig"), df]))
+                return
+            df = df[cabecalho]
+
+        novos = _hash_linhas(df)
+
+        if not csv_file.exists():
+            # Sem CSV, um .rowhash.npy que sobrou não vale: tudo é novo
+            vistos = np.empty(0, dtype=np.uint64)
+        elif keys_file.exists():
+            vistos = np.load(keys_file)
+        else:
+            # CSV legado sem índice de chaves: monta uma única vez
+            vistos = _hash_linhas(pd.read_csv(csv_file, encoding="utf-8-sig"))
+
+        # Primeira ocorrência de cada linha, ignorando as já gravadas
+        manter = np.zeros(len(novos), dtype=bool)
+        manter[np.unique(novos, return_index=True)[1]] = True
+        manter &= ~np.isin(novos, vistos)
+
+        if manter.any():
+            if csv_file.exists():
+                df[manter].to_csv(csv_file, mode="a", header=False, index=False, encoding="utf-8")
+            else:
+                df[manter].to_csv(csv_file, index=False, encoding="utf-8-sig")
+
+        vistos = np.concatenate([vistos, novos[manter]])
+        np.save(keys_file, vistos)
 
-    if csv_file.exists():
-        df_old = pd.read_csv(csv_file, low_memory=False)
-        df_final = pd.concat([df_old, df]).drop_duplicates().reset_index(drop=True)
-    else:
-        df_final = df
+    logging.info(f"   ✅ {int(manter.sum())} linhas novas, {len(vistos)} no total em {csv_file}")
 
-    df_final.to_csv(csv_file, index=False, encoding="utf-8-sig")
-    logging.info(f"   ✅ {len(df_final)} linhas salvas em {csv_file}")
+def _regravar_csv(csv_file, keys_file, df):
+    """Regrava o CSV inteiro (colunas mudaram) e reconstrói o índice de chaves."""
+    df = df.drop_duplicates()
+    df.to_csv(csv_file, index=False, encoding="utf-8-sig")
+    np.save(keys_file, _hash_linhas(df))
+    logging.info(f"   ♻️ Colunas mudaram: {len(df)} linhas regravadas em {csv_file}")
 
 # ==========================================================
 # Execução principal
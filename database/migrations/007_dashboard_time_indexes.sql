@@ -0,0 +1,35 @@
+-- =====================================================
+-- SCRIPT SQL - ÍNDICES PARA AS JANELAS DE TEMPO DO DASHBOARD
+-- =====================================================
+-- O dashboard de monitoramento filtra sempre por "últimos N minutos/horas"
+-- (timestamp / created_at > NOW() - INTERVAL ...). monitoring_metrics e
+-- error_logs já têm btree nessas colunas (migração 005); data_records não,
+-- e como é append-only (ordem física acompanha o tempo) um BRIN de poucos
+-- KB basta para ler só os blocos recentes.
+--
+-- CREATE INDEX CONCURRENTLY não roda dentro de transação: execute o arquivo
+-- com autocommit (psql padrão, sem --single-transaction).
+
+-- =====================================================
+-- 1. BRIN NA COLUNA DE TEMPO DE data_records
+-- =====================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_data_records_created_brin
+    ON data_records USING BRIN (created_at) WITH (pages_per_range = 32);
+
+-- =====================================================
+-- 2. ÍNDICES PARCIAIS/COMPOSTOS DOS PAINÉIS
+-- =====================================================
+
+-- Alertas ativos: só linhas fora do estado 'ok', mais recentes primeiro
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_monitoring_metrics_alerts
+    ON monitoring_metrics (timestamp DESC) WHERE status <> 'ok';
+
+-- Rollups de ingestão/chat: filtro por nome de métrica + janela de tempo
+-- (pattern_ops permite usar o índice também no prefixo LIKE 'ingestion_%')
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_monitoring_metrics_name_ts
+    ON monitoring_metrics (metric_name varchar_pattern_ops, timestamp DESC);
+
+-- Atualizar estatísticas para o planner considerar os novos índices
+ANALYZE monitoring_metrics;
+ANALYZE data_records;
@@ -5,19 +5,52 @@ Executa em paralelo ao sistema principal para monitoramento de produção
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+from psycopg2.pool import ThreadedConnectionPool
 import redis
 import requests
 from datetime import datetime, timedelta
 import time
 import json
 import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
-import numpy as np
+
+try:
+    from streamlit_autorefresh import st_autorefresh
+    AUTOREFRESH_AVAILABLE = True
+except ImportError:
+    AUTOREFRESH_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    # Colunas json/jsonb do snapshot decodificadas pelo orjson
+    psycopg2.extras.register_default_json(globally=True, loads=orjson.loads)
+    psycopg2.extras.register_default_jsonb(globally=True, loads=orjson.loads)
+
+# st.fragment(run_every=...) (Streamlit >= 1.37) reexecuta só parte da página
+FRAGMENT_AVAILABLE = hasattr(st, 'fragment')
 
 # ============= Configuração da Página =============
 
@@ -88,36 +121,127 @@ st.markdown("""
 
 # ============= Conexões =============
 
+class _DashboardConnection(psycopg2.extensions.connection):
+    """Conexão que lembra quais statements já foram preparados nela."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
 @st.cache_resource
-def get_db_connection():
-    """Criar conexão com PostgreSQL."""
-    return psycopg2.connect(
+def get_pg_pool() -> ThreadedConnectionPool:
+    """Pool de conexões PostgreSQL compartilhado entre sessões e threads."""
+    return ThreadedConnectionPool(
+        minconn=2,
+        maxconn=20,
         host=os.getenv("DB_HOST", "localhost"),
         port=os.getenv("DB_PORT", "5432"),
         database=os.getenv("DB_NAME", "aide_db"),
         user=os.getenv("DB_USER", "aide_user"),
-        password=os.getenv("DB_PASSWORD", "aide_secure_password_123")
+        password=os.getenv("DB_PASSWORD", "aide_secure_password_123"),
+        connection_factory=_DashboardConnection
     )
 
+@contextmanager
+def get_db_connection():
+    """Emprestar uma conexão do pool pelo tempo do bloco.
+    
+    Conexões quebradas são descartadas em vez de voltarem ao pool.
+    """
+    pool = get_pg_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.rollback()  # encerra a transação de leitura antes de devolver
+    except Exception:
+        pool.putconn(conn, close=bool(conn.closed))
+        raise
+    else:
+        pool.putconn(conn)
+
 @st.cache_resource
-def get_redis_connection():
-    """Criar conexão com Redis."""
-    return redis.Redis(
+def get_redis_pool() -> redis.ConnectionPool:
+    """Pool de conexões Redis compartilhado entre sessões e threads."""
+    return redis.ConnectionPool(
         host=os.getenv("REDIS_HOST", "localhost"),
         port=int(os.getenv("REDIS_PORT", "6379")),
         password=os.getenv("REDIS_PASSWORD", ""),
-        decode_responses=True
+        decode_responses=True,
+        max_connections=32
     )
 
+def get_redis_connection() -> redis.Redis:
+    """Cliente Redis leve sobre o pool compartilhado."""
+    return redis.Redis(connection_pool=get_redis_pool())
+
+def _pool_stat(pool, attr: str) -> Optional[int]:
+    """Lê um contador interno do pool (tamanho se for coleção).
+    
+    Os atributos são privados das bibliotecas (psycopg2/redis-py) e podem
+    sumir numa atualização: nesse caso a métrica fica indisponível (None).
+    """
+    value = getattr(pool, attr, None)
+    if value is None:
+        return None
+    try:
+        return value if isinstance(value, int) else len(value)
+    except TypeError:
+        return None
+
+def get_pool_metrics() -> Dict:
+    """Ocupação dos pools de conexões PostgreSQL e Redis deste processo.
+    
+    Métricas que não puderem ser lidas vêm como None.
+    """
+    metrics = {}
+    try:
+        pool = get_pg_pool()
+        metrics.update({
+            'pg_pool_used': _pool_stat(pool, '_used'),
+            'pg_pool_idle': _pool_stat(pool, '_pool'),
+            'pg_pool_max': getattr(pool, 'maxconn', None)
+        })
+    except Exception:
+        pass
+    
+    pool = get_redis_pool()
+    metrics.update({
+        'redis_pool_created': _pool_stat(pool, '_created_connections'),
+        'redis_pool_idle': _pool_stat(pool, '_available_connections'),
+        'redis_pool_in_use': _pool_stat(pool, '_in_use_connections')
+    })
+    return metrics
+
+def _or_na(value) -> str:
+    """Valor de métrica para exibição ('n/d' quando indisponível)."""
+    return 'n/d' if value is None else str(value)
+
 # ============= Funções de Coleta de Métricas =============
 
+# Resultados dos coletores são compartilhados entre todos os viewers do
+# processo por um pouco menos que o menor intervalo de auto-refresh (5s)
+COLLECTOR_TTL = 4
+
+# Último payload de saúde e seu parse: a chave muda menos que o refresh
+_last_health_raw = None
+_last_health_obj = None
+
+def _parse_health(raw: str) -> Dict:
+    """Decodificar o JSON de saúde, reaproveitando o parse se o payload não mudou."""
+    global _last_health_raw, _last_health_obj
+    if raw != _last_health_raw:
+        _last_health_obj = _json_loads(raw)
+        _last_health_raw = raw
+    return _last_health_obj
+
+@st.cache_data(ttl=COLLECTOR_TTL, show_spinner=False)
 def get_system_health() -> Dict:
     """Obter saúde geral do sistema."""
     try:
         r = get_redis_connection()
         health_data = r.get("health:latest")
         if health_data:
-            return json.loads(health_data)
+            return _parse_health(health_data)
     except:
         pass
     
@@ -127,221 +251,246 @@ def get_system_health() -> Dict:
         "timestamp": datetime.now().isoformat()
     }
 
-def get_database_metrics() -> Dict:
-    """Coletar métricas do banco de dados."""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        metrics = {}
-        
-        # Tamanho do banco
-        cur.execute("""
-            SELECT pg_database_size('aide_db')/1024/1024 as size_mb
-        """)
-        metrics['db_size_mb'] = cur.fetchone()[0]
-        
-        # Número de conexões ativas
-        cur.execute("""
-            SELECT count(*) FROM pg_stat_activity 
-            WHERE state = 'active'
-        """)
-        metrics['active_connections'] = cur.fetchone()[0]
-        
-        # Queries longas
-        cur.execute("""
-            SELECT count(*) FROM pg_stat_activity 
-            WHERE state = 'active' 
-            AND now() - query_start > interval '5 seconds'
-        """)
-        metrics['long_queries'] = cur.fetchone()[0]
-        
-        # Total de registros
-        cur.execute("SELECT COUNT(*) FROM data_records")
-        metrics['total_records'] = cur.fetchone()[0]
-        
-        # Registros das últimas 24h
-        cur.execute("""
-            SELECT COUNT(*) FROM data_records 
-            WHERE created_at > NOW() - INTERVAL '24 hours'
-        """)
-        metrics['recent_records'] = cur.fetchone()[0]
-        
-        cur.close()
-        conn.close()
-        
-        return metrics
-    except Exception as e:
-        st.error(f"Erro ao coletar métricas do banco: {e}")
-        return {}
-
+@st.cache_data(ttl=COLLECTOR_TTL, show_spinner=False)
 def get_redis_metrics() -> Dict:
     """Coletar métricas do Redis."""
     try:
         r = get_redis_connection()
-        info = r.info()
+        
+        # Só as seções usadas, num único round-trip
+        pipe = r.pipeline(transaction=False)
+        pipe.info('memory')
+        pipe.info('clients')
+        pipe.info('stats')
+        memory, clients, stats = pipe.execute()
+        hits = stats.get('keyspace_hits', 0)
+        misses = stats.get('keyspace_misses', 0)
         
         return {
-            'used_memory_mb': info.get('used_memory', 0) / (1024 * 1024),
-            'connected_clients': info.get('connected_clients', 0),
-            'total_commands': info.get('total_commands_processed', 0),
-            'keyspace_hits': info.get('keyspace_hits', 0),
-            'keyspace_misses': info.get('keyspace_misses', 0),
-            'hit_rate': (info.get('keyspace_hits', 0) / 
-                        max(1, info.get('keyspace_hits', 0) + info.get('keyspace_misses', 0))) * 100
+            'used_memory_mb': memory.get('used_memory', 0) / (1024 * 1024),
+            'connected_clients': clients.get('connected_clients', 0),
+            'total_commands': stats.get('total_commands_processed', 0),
+            'keyspace_hits': hits,
+            'keyspace_misses': misses,
+            'hit_rate': hits / max(1, hits + misses) * 100
         }
     except Exception as e:
         st.error(f"Erro ao coletar métricas do Redis: {e}")
         return {}
 
-def get_workflow_metrics() -> Dict:
-    """Coletar métricas dos workflows n8n."""
+# Todas as métricas do Postgres em uma única consulta (um round-trip por tick):
+# cada bloco vira um objeto/array JSON na mesma linha de resultado
+_DASHBOARD_SQL = """
+    WITH db AS (
+        SELECT
+            pg_database_size('aide_db')/1024/1024 AS db_size_mb,
+            (SELECT count(*) FROM pg_stat_activity
+             WHERE state = 'active') AS active_connections,
+            (SELECT count(*) FROM pg_stat_activity
+             WHERE state = 'active'
+               AND now() - query_start > interval '5 seconds') AS long_queries,
+            (SELECT COUNT(*) FROM data_records) AS total_records,
+            (SELECT COUNT(*) FROM data_records
+             WHERE created_at > NOW() - INTERVAL '24 hours') AS recent_records
+    ),
+    workflows AS (
+        -- Ingestão e chat numa única varredura da última hora
+        SELECT
+            json_build_object(
+                'total', COUNT(*) FILTER (WHERE metric_name LIKE 'ingestion_%%'),
+                'success', COUNT(*) FILTER (WHERE metric_name LIKE 'ingestion_%%'
+                                             AND status = 'success'),
+                'errors', COUNT(*) FILTER (WHERE metric_name LIKE 'ingestion_%%'
+                                            AND status = 'error'),
+                'avg_time', AVG(value) FILTER (WHERE metric_name LIKE 'ingestion_%%')
+            ) AS ingestion,
+            json_build_object(
+                'total', COUNT(*) FILTER (WHERE metric_name = 'chat_request'),
+                'avg_time', AVG(CAST(details->>'processing_time_ms' AS FLOAT))
+                            FILTER (WHERE metric_name = 'chat_request')
+            ) AS chat
+        FROM monitoring_metrics
+        WHERE timestamp > NOW() - INTERVAL '1 hour'
+            AND (metric_name LIKE 'ingestion_%%' OR metric_name = 'chat_request')
+    ),
+    alerts AS (
+        SELECT
+            metric_name AS metric,
+            status,
+            message,
+            severity,
+            timestamp,
+            CASE severity
+                WHEN 'critical' THEN 1
+                WHEN 'high' THEN 2
+                WHEN 'medium' THEN 3
+                ELSE 4
+            END AS severity_rank
+        FROM monitoring_metrics
+        WHERE status != 'ok'
+            AND timestamp > NOW() - INTERVAL '30 minutes'
+    ),
+    errs AS (
+        SELECT
+            workflow,
+            error_message AS message,
+            severity,
+            created_at AS timestamp
+        FROM error_logs
+        ORDER BY created_at DESC
+        LIMIT %(error_limit)s
+    ),
+    perf AS (
+        SELECT
+            DATE_TRUNC('minute', timestamp) AS time,
+            AVG(CASE WHEN metric_name = 'api_response_time' THEN value END) AS api_time,
+            AVG(CASE WHEN metric_name = 'chat_request' THEN value END) AS chat_time,
+            COUNT(CASE WHEN status = 'error' THEN 1 END) AS errors
+        FROM monitoring_metrics
+        WHERE timestamp > NOW() - INTERVAL '1 hour'
+        GROUP BY 1
+    )
+    SELECT
+        (SELECT row_to_json(db) FROM db),
+        (SELECT ingestion FROM workflows),
+        (SELECT chat FROM workflows),
+        (SELECT COALESCE(json_agg(alerts ORDER BY severity_rank, timestamp DESC), '[]')
+         FROM alerts),
+        (SELECT COALESCE(json_agg(errs ORDER BY timestamp DESC), '[]') FROM errs),
+        (SELECT json_build_object(
+            'time', json_agg(time ORDER BY time),
+            'api_time', json_agg(api_time ORDER BY time),
+            'chat_time', json_agg(chat_time ORDER BY time),
+            'errors', json_agg(errors ORDER BY time)
+        ) FROM perf)
+"""
+
+# Versão PREPARE do SQL acima (parâmetro posicional, sem escape de %)
+_DASHBOARD_PREPARE = "PREPARE q_dashboard(int) AS " + (
+    _DASHBOARD_SQL.replace("%(error_limit)s", "$1").replace("%%", "%")
+)
+
+def _prepare_once(conn) -> None:
+    """Preparar o plano da consulta do dashboard uma vez por conexão."""
+    if 'q_dashboard' not in conn.prepared:
+        with conn.cursor() as cur:
+            cur.execute(_DASHBOARD_PREPARE)
+        conn.prepared.add('q_dashboard')
+
+@dataclass(slots=True)
+class DashboardTick:
+    """Resultado do snapshot do Postgres em um tick do dashboard."""
+    db_size_mb: float = 0.0
+    active_connections: int = 0
+    long_queries: int = 0
+    total_records: int = 0
+    recent_records: int = 0
+    ingestion_total: int = 0
+    ingestion_success: int = 0
+    ingestion_errors: int = 0
+    ingestion_avg_time: float = 0.0
+    chat_total: int = 0
+    chat_avg_time: float = 0.0
+    alerts: List[Dict] = field(default_factory=list)
+    errors: List[Dict] = field(default_factory=list)
+    performance: pd.DataFrame = field(default_factory=pd.DataFrame)
+    
+    @property
+    def ingestion_pending(self) -> int:
+        return self.ingestion_total - self.ingestion_success - self.ingestion_errors
+
+@st.cache_data(ttl=COLLECTOR_TTL, show_spinner=False)
+def get_dashboard_snapshot(error_limit: int = 5) -> DashboardTick:
+    """Coletar métricas do banco, workflows, alertas, erros e performance
+    em uma única consulta."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Métricas de ingestão
-        cur.execute("""
-            SELECT 
-                COUNT(*) as total,
-                COUNT(CASE WHEN status = 'success' THEN 1 END) as success,
-                COUNT(CASE WHEN status = 'error' THEN 1 END) as errors,
-                AVG(CASE WHEN value IS NOT NULL THEN value END) as avg_time
-            FROM monitoring_metrics
-            WHERE metric_name LIKE 'ingestion_%'
-                AND timestamp > NOW() - INTERVAL '1 hour'
-        """)
-        ingestion = cur.fetchone()
-        
-        # Métricas de chat
-        cur.execute("""
-            SELECT 
-                COUNT(*) as total_messages,
-                AVG(CAST(details->>'processing_time_ms' AS FLOAT)) as avg_time
-            FROM monitoring_metrics
-            WHERE metric_name = 'chat_request'
-                AND timestamp > NOW() - INTERVAL '1 hour'
-        """)
-        chat = cur.fetchone()
-        
-        cur.close()
-        conn.close()
-        
-        return {
-            'ingestion': {
-                'total': ingestion[0] if ingestion else 0,
-                'success': ingestion[1] if ingestion else 0,
-                'errors': ingestion[2] if ingestion else 0,
-                'avg_time': ingestion[3] if ingestion else 0
-            },
-            'chat': {
-                'total': chat[0] if chat else 0,
-                'avg_time': chat[1] if chat else 0
-            }
-        }
+        with get_db_connection() as conn:
+            _prepare_once(conn)
+            with conn.cursor() as cur:
+                # Servidor reaproveita o plano: sem parse/planejamento por tick
+                cur.execute("EXECUTE q_dashboard(%s)", (error_limit,))
+                db, ingestion, chat, alerts, errors, perf = cur.fetchone()
     except Exception as e:
-        st.error(f"Erro ao coletar métricas de workflows: {e}")
-        return {}
+        st.error(f"Erro ao coletar métricas do banco: {e}")
+        return DashboardTick()
+    
+    # json_agg devolve timestamps como texto ISO
+    for alert in alerts:
+        alert.pop('severity_rank', None)
+        alert['timestamp'] = datetime.fromisoformat(alert['timestamp'])
+    
+    tick = DashboardTick(
+        db_size_mb=db['db_size_mb'] or 0,
+        active_connections=db['active_connections'] or 0,
+        long_queries=db['long_queries'] or 0,
+        total_records=db['total_records'] or 0,
+        recent_records=db['recent_records'] or 0,
+        ingestion_total=ingestion['total'] or 0,
+        ingestion_success=ingestion['success'] or 0,
+        ingestion_errors=ingestion['errors'] or 0,
+        ingestion_avg_time=ingestion['avg_time'] or 0,
+        chat_total=chat['total'] or 0,
+        chat_avg_time=chat['avg_time'] or 0,
+        alerts=alerts,
+        errors=errors
+    )
+    
+    # Série chega em colunas (um array por campo), não em objetos por linha
+    if perf and perf['time']:
+        df = pd.DataFrame(perf)
+        df['time'] = pd.to_datetime(df['time'])
+        tick.performance = df
+    
+    return tick
 
-def get_error_logs(limit: int = 10) -> List[Dict]:
-    """Obter logs de erro recentes."""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT 
-                workflow,
-                error_message,
-                severity,
-                created_at
-            FROM error_logs
-            ORDER BY created_at DESC
-            LIMIT %s
-        """, (limit,))
-        
-        errors = []
-        for row in cur.fetchall():
-            errors.append({
-                'workflow': row[0],
-                'message': row[1],
-                'severity': row[2],
-                'timestamp': row[3]
-            })
-        
-        cur.close()
-        conn.close()
-        
-        return errors
-    except:
-        return []
+def get_host_metrics() -> Dict:
+    """CPU, memória, disco e rede do host via psutil.
+    
+    Disco (MB/s) e rede (Mbps) são taxas calculadas contra a leitura
+    anterior guardada na sessão.
+    """
+    if not PSUTIL_AVAILABLE:
+        return {}
+    
+    now = time.monotonic()
+    disk = psutil.disk_io_counters()
+    net = psutil.net_io_counters()
+    disk_bytes = (disk.read_bytes + disk.write_bytes) if disk else 0
+    net_bytes = (net.bytes_sent + net.bytes_recv) if net else 0
+    
+    metrics = {
+        'cpu_percent': psutil.cpu_percent(interval=None),
+        'memory_percent': psutil.virtual_memory().percent,
+        'disk_mb_s': 0.0,
+        'net_mbps': 0.0
+    }
+    
+    prev = st.session_state.get('_host_prev')
+    if prev:
+        elapsed = max(now - prev[0], 1e-3)
+        metrics['disk_mb_s'] = (disk_bytes - prev[1]) / elapsed / (1024 * 1024)
+        metrics['net_mbps'] = (net_bytes - prev[2]) * 8 / elapsed / 1e6
+    st.session_state['_host_prev'] = (now, disk_bytes, net_bytes)
+    
+    return metrics
 
-def get_active_alerts() -> List[Dict]:
-    """Obter alertas ativos."""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT 
-                metric_name,
-                status,
-                message,
-                severity,
-                timestamp
-            FROM monitoring_metrics
-            WHERE status != 'ok'
-                AND timestamp > NOW() - INTERVAL '30 minutes'
-            ORDER BY 
-                CASE severity 
-                    WHEN 'critical' THEN 1
-                    WHEN 'high' THEN 2
-                    WHEN 'medium' THEN 3
-                    ELSE 4
-                END,
-                timestamp DESC
-        """)
-        
-        alerts = []
-        for row in cur.fetchall():
-            alerts.append({
-                'metric': row[0],
-                'status': row[1],
-                'message': row[2],
-                'severity': row[3],
-                'timestamp': row[4]
-            })
-        
-        cur.close()
-        conn.close()
-        
-        return alerts
-    except:
-        return []
+# Coletores executados a cada tick
+_COLLECTORS = {
+    'health': get_system_health,
+    'snapshot': get_dashboard_snapshot,
+    'redis': get_redis_metrics,
+    'pools': get_pool_metrics
+}
 
-def get_performance_timeseries() -> pd.DataFrame:
-    """Obter série temporal de performance."""
-    try:
-        conn = get_db_connection()
-        
-        query = """
-            SELECT 
-                DATE_TRUNC('minute', timestamp) as time,
-                AVG(CASE WHEN metric_name = 'api_response_time' THEN value END) as api_time,
-                AVG(CASE WHEN metric_name = 'chat_request' THEN value END) as chat_time,
-                COUNT(CASE WHEN status = 'error' THEN 1 END) as errors
-            FROM monitoring_metrics
-            WHERE timestamp > NOW() - INTERVAL '1 hour'
-            GROUP BY time
-            ORDER BY time
-        """
-        
-        df = pd.read_sql(query, conn)
-        conn.close()
-        
-        return df
-    except:
-        return pd.DataFrame()
+def collect_all() -> Dict:
+    """Executar todos os coletores em paralelo e devolver os resultados por nome."""
+    # As threads herdam o contexto do script para que st.error funcione nelas
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=len(_COLLECTORS),
+                            initializer=add_script_run_ctx,
+                            initargs=(None, ctx)) as ex:
+        futures = {name: ex.submit(fn) for name, fn in _COLLECTORS.items()}
+        return {name: f.result() for name, f in futures.items()}
 
 # ============= Dashboard Principal =============
 
@@ -354,316 +503,338 @@ refresh_interval = st.sidebar.selectbox(
     index=1
 )
 
-placeholder = st.empty()
+def render_dashboard():
+    """Bloco dinâmico do dashboard: métricas, alertas, gráficos e logs."""
+    # Coletores independentes (Postgres, Redis) em paralelo: a latência
+    # do tick passa a ser a do mais lento, não a soma de todos
+    results = collect_all()
+    tick = results['snapshot']
+
+    # Header com status geral
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+
+    with col1:
+        health = results['health']
+        health_score = health.get('health_score', 0)
+
+        if health_score >= 80:
+            score_class = "health-score-high"
+            status_class = "status-healthy"
+            status_text = "Sistema Operacional"
+        elif health_score >= 50:
+            score_class = "health-score-medium"
+            status_class = "status-warning"
+            status_text = "Sistema Degradado"
+        else:
+            score_class = "health-score-low"
+            status_class = "status-critical"
+            status_text = "Sistema Crítico"
+
+        st.markdown(f"""
+            <div style="text-align: center;">
+                <h2>Health Score</h2>
+                <div class="{score_class}">{health_score}%</div>
+                <p><span class="status-indicator {status_class}"></span>{status_text}</p>
+                <small>Última atualização: {datetime.now().strftime('%H:%M:%S')}</small>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.metric(
+            "Database Size",
+            f"{tick.db_size_mb:.1f} MB",
+            delta=f"{tick.recent_records} new records"
+        )
+        st.metric(
+            "Active Connections",
+            tick.active_connections,
+            delta=tick.long_queries
+        )
+
+    with col3:
+        redis_metrics = results['redis']
+        st.metric(
+            "Redis Memory",
+            f"{redis_metrics.get('used_memory_mb', 0):.1f} MB",
+            delta=f"{redis_metrics.get('connected_clients', 0)} clients"
+        )
+        st.metric(
+            "Cache Hit Rate",
+            f"{redis_metrics.get('hit_rate', 0):.1f}%"
+        )
+        st.metric(
+            "Redis Pool In-Use",
+            _or_na(results['pools'].get('redis_pool_in_use')),
+            delta=f"{_or_na(results['pools'].get('redis_pool_idle'))} idle",
+            delta_color="off"
+        )
+
+    with col4:
+
+        st.metric(
+            "Workflows (1h)",
+            tick.ingestion_total + tick.chat_total,
+            delta=f"{tick.ingestion_errors} errors"
+        )
+        st.metric(
+            "Avg Response",
+            f"{tick.chat_avg_time:.0f} ms"
+        )
+
+    st.markdown("---")
+
+    # Alertas Ativos
+    alerts = tick.alerts
+    if alerts:
+        st.subheader("🚨 Alertas Ativos")
+
+        for alert in alerts[:5]:
+            severity = alert['severity']
+            alert_class = 'alert-critical' if severity == 'critical' else 'alert-warning'
 
-while True:
-    with placeholder.container():
-        
-        # Header com status geral
-        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
-        
-        with col1:
-            health = get_system_health()
-            health_score = health.get('health_score', 0)
-            
-            if health_score >= 80:
-                score_class = "health-score-high"
-                status_class = "status-healthy"
-                status_text = "Sistema Operacional"
-            elif health_score >= 50:
-                score_class = "health-score-medium"
-                status_class = "status-warning"
-                status_text = "Sistema Degradado"
-            else:
-                score_class = "health-score-low"
-                status_class = "status-critical"
-                status_text = "Sistema Crítico"
-            
             st.markdown(f"""
-                <div style="text-align: center;">
-                    <h2>Health Score</h2>
-                    <div class="{score_class}">{health_score}%</div>
-                    <p><span class="status-indicator {status_class}"></span>{status_text}</p>
-                    <small>Última atualização: {datetime.now().strftime('%H:%M:%S')}</small>
+                <div class="alert-box {alert_class}">
+                    <strong>{alert['metric']}</strong> - {alert['status'].upper()}<br>
+                    {alert['message']}<br>
+                    <small>{alert['timestamp'].strftime('%H:%M:%S')}</small>
                 </div>
             """, unsafe_allow_html=True)
-        
-        with col2:
-            db_metrics = get_database_metrics()
-            st.metric(
-                "Database Size",
-                f"{db_metrics.get('db_size_mb', 0):.1f} MB",
-                delta=f"{db_metrics.get('recent_records', 0)} new records"
-            )
-            st.metric(
-                "Active Connections",
-                db_metrics.get('active_connections', 0),
-                delta=db_metrics.get('long_queries', 0)
-            )
-        
-        with col3:
-            redis_metrics = get_redis_metrics()
-            st.metric(
-                "Redis Memory",
-                f"{redis_metrics.get('used_memory_mb', 0):.1f} MB",
-                delta=f"{redis_metrics.get('connected_clients', 0)} clients"
-            )
-            st.metric(
-                "Cache Hit Rate",
-                f"{redis_metrics.get('hit_rate', 0):.1f}%"
-            )
-        
-        with col4:
-            workflow_metrics = get_workflow_metrics()
-            ingestion = workflow_metrics.get('ingestion', {})
-            chat = workflow_metrics.get('chat', {})
-            
-            st.metric(
-                "Workflows (1h)",
-                ingestion.get('total', 0) + chat.get('total', 0),
-                delta=f"{ingestion.get('errors', 0)} errors"
-            )
-            st.metric(
-                "Avg Response",
-                f"{chat.get('avg_time', 0):.0f} ms"
-            )
-        
-        st.markdown("---")
-        
-        # Alertas Ativos
-        alerts = get_active_alerts()
-        if alerts:
-            st.subheader("🚨 Alertas Ativos")
-            
-            for alert in alerts[:5]:
-                severity = alert['severity']
-                alert_class = 'alert-critical' if severity == 'critical' else 'alert-warning'
-                
-                st.markdown(f"""
-                    <div class="alert-box {alert_class}">
-                        <strong>{alert['metric']}</strong> - {alert['status'].upper()}<br>
-                        {alert['message']}<br>
-                        <small>{alert['timestamp'].strftime('%H:%M:%S')}</small>
-                    </div>
-                """, unsafe_allow_html=True)
-        
-        # Gráficos de Performance
-        st.subheader("📈 Performance Metrics")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Gráfico de série temporal
-            df_perf = get_performance_timeseries()
-            if not df_perf.empty:
-                fig = go.Figure()
-                
-                fig.add_trace(go.Scatter(
-                    x=df_perf['time'],
-                    y=df_perf['api_time'],
-                    name='API Response Time',
-                    line=dict(color='#667eea', width=2)
-                ))
-                
-                fig.add_trace(go.Scatter(
-                    x=df_perf['time'],
-                    y=df_perf['chat_time'],
-                    name='Chat Processing',
-                    line=dict(color='#764ba2', width=2)
-                ))
-                
-                fig.update_layout(
-                    title="Response Time (Last Hour)",
-                    xaxis_title="Time",
-                    yaxis_title="Time (ms)",
-                    height=300,
-                    showlegend=True,
-                    hovermode='x unified'
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Gráfico de distribuição de workflows
-            workflow_data = workflow_metrics.get('ingestion', {})
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=['Success', 'Errors', 'Pending'],
-                    y=[
-                        workflow_data.get('success', 0),
-                        workflow_data.get('errors', 0),
-                        workflow_data.get('total', 0) - workflow_data.get('success', 0) - workflow_data.get('errors', 0)
-                    ],
-                    marker_color=['#00cc44', '#ff3333', '#ffaa00']
-                )
-            ])
-            
+
+    # Gráficos de Performance
+    st.subheader("📈 Performance Metrics")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Gráfico de série temporal
+        df_perf = tick.performance
+        if not df_perf.empty:
+            fig = go.Figure()
+
+            fig.add_trace(go.Scatter(
+                x=df_perf['time'],
+                y=df_perf['api_time'],
+                name='API Response Time',
+                line=dict(color='#667eea', width=2)
+            ))
+
+            fig.add_trace(go.Scatter(
+                x=df_perf['time'],
+                y=df_perf['chat_time'],
+                name='Chat Processing',
+                line=dict(color='#764ba2', width=2)
+            ))
+
             fig.update_layout(
-                title="Workflow Status (Last Hour)",
-                yaxis_title="Count",
+                title="Response Time (Last Hour)",
+                xaxis_title="Time",
+                yaxis_title="Time (ms)",
                 height=300,
-                showlegend=False
+                showlegend=True,
+                hovermode='x unified'
             )
-            
+
             st.plotly_chart(fig, use_container_width=True)
-        
-        # Sistema de Métricas Detalhadas
-        st.subheader("📊 System Metrics")
-        
-        # Criar gauge charts para métricas principais
-        fig = make_subplots(
-            rows=1, cols=4,
-            specs=[[{'type': 'indicator'}, {'type': 'indicator'}, 
-                   {'type': 'indicator'}, {'type': 'indicator'}]],
-            subplot_titles=("CPU Usage", "Memory Usage", "Disk I/O", "Network Traffic")
-        )
-        
-        # CPU Usage (simulado)
-        cpu_usage = np.random.uniform(20, 80)
-        fig.add_trace(
-            go.Indicator(
-                mode="gauge+number",
-                value=cpu_usage,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                gauge={'axis': {'range': [0, 100]},
-                      'bar': {'color': "darkblue"},
-                      'steps': [
-                          {'range': [0, 50], 'color': "lightgray"},
-                          {'range': [50, 80], 'color': "yellow"},
-                          {'range': [80, 100], 'color': "red"}]},
-                title={'text': "CPU %"}
-            ),
-            row=1, col=1
-        )
-        
-        # Memory Usage
-        memory_usage = redis_metrics.get('used_memory_mb', 0) / 100 * 100  # Percentual
-        fig.add_trace(
-            go.Indicator(
-                mode="gauge+number",
-                value=min(memory_usage, 100),
-                domain={'x': [0, 1], 'y': [0, 1]},
-                gauge={'axis': {'range': [0, 100]},
-                      'bar': {'color': "purple"}},
-                title={'text': "Memory %"}
-            ),
-            row=1, col=2
+
+    with col2:
+        # Gráfico de distribuição de workflows
+        fig = go.Figure(data=[
+            go.Bar(
+                x=['Success', 'Errors', 'Pending'],
+                y=[
+                    tick.ingestion_success,
+                    tick.ingestion_errors,
+                    tick.ingestion_pending
+                ],
+                marker_color=['#00cc44', '#ff3333', '#ffaa00']
+            )
+        ])
+
+        fig.update_layout(
+            title="Workflow Status (Last Hour)",
+            yaxis_title="Count",
+            height=300,
+            showlegend=False
         )
-        
-        # Disk I/O (simulado)
-        disk_io = np.random.uniform(100, 500)
-        fig.add_trace(
-            go.Indicator(
-                mode="gauge+number",
-                value=disk_io,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                gauge={'axis': {'range': [0, 1000]},
-                      'bar': {'color': "green"}},
-                title={'text': "MB/s"}
-            ),
-            row=1, col=3
+
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Sistema de Métricas Detalhadas
+    st.subheader("📊 System Metrics")
+
+    # Criar gauge charts para métricas principais
+    fig = make_subplots(
+        rows=1, cols=4,
+        specs=[[{'type': 'indicator'}, {'type': 'indicator'}, 
+               {'type': 'indicator'}, {'type': 'indicator'}]],
+        subplot_titles=("CPU Usage", "Memory Usage", "Disk I/O", "Network Traffic")
+    )
+
+    # Uma leitura do host por tick (sem valores simulados)
+    host = get_host_metrics()
+    
+    # CPU Usage
+    cpu_usage = host.get('cpu_percent', 0)
+    fig.add_trace(
+        go.Indicator(
+            mode="gauge+number",
+            value=cpu_usage,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            gauge={'axis': {'range': [0, 100]},
+                  'bar': {'color': "darkblue"},
+                  'steps': [
+                      {'range': [0, 50], 'color': "lightgray"},
+                      {'range': [50, 80], 'color': "yellow"},
+                      {'range': [80, 100], 'color': "red"}]},
+            title={'text': "CPU %"}
+        ),
+        row=1, col=1
+    )
+
+    # Memory Usage
+    memory_usage = host.get('memory_percent', 0)
+    fig.add_trace(
+        go.Indicator(
+            mode="gauge+number",
+            value=min(memory_usage, 100),
+            domain={'x': [0, 1], 'y': [0, 1]},
+            gauge={'axis': {'range': [0, 100]},
+                  'bar': {'color': "purple"}},
+            title={'text': "Memory %"}
+        ),
+        row=1, col=2
+    )
+
+    # Disk I/O
+    disk_io = host.get('disk_mb_s', 0)
+    fig.add_trace(
+        go.Indicator(
+            mode="gauge+number",
+            value=disk_io,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            gauge={'axis': {'range': [0, 1000]},
+                  'bar': {'color': "green"}},
+            title={'text': "MB/s"}
+        ),
+        row=1, col=3
+    )
+
+    # Network Traffic
+    network_traffic = host.get('net_mbps', 0)
+    fig.add_trace(
+        go.Indicator(
+            mode="gauge+number",
+            value=network_traffic,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            gauge={'axis': {'range': [0, 500]},
+                  'bar': {'color': "orange"}},
+            title={'text': "Mbps"}
+        ),
+        row=1, col=4
+    )
+
+    fig.update_layout(height=250, showlegend=False)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Logs de Erro
+    st.subheader("📝 Recent Error Logs")
+
+    errors = tick.errors
+    if errors:
+        error_df = pd.DataFrame(errors)
+        error_df['timestamp'] = pd.to_datetime(error_df['timestamp'])
+
+        # Colorir por severidade
+        def color_severity(val):
+            if val == 'critical':
+                return 'background-color: #ffe6e6'
+            elif val == 'high':
+                return 'background-color: #fff3cd'
+            return ''
+
+        styled_df = error_df.style.applymap(
+            color_severity, 
+            subset=['severity']
         )
-        
-        # Network Traffic (simulado)
-        network_traffic = np.random.uniform(50, 200)
-        fig.add_trace(
-            go.Indicator(
-                mode="gauge+number",
-                value=network_traffic,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                gauge={'axis': {'range': [0, 500]},
-                      'bar': {'color': "orange"}},
-                title={'text': "Mbps"}
-            ),
-            row=1, col=4
+
+        st.dataframe(
+            styled_df,
+            use_container_width=True,
+            hide_index=True
         )
-        
-        fig.update_layout(height=250, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Logs de Erro
-        st.subheader("📝 Recent Error Logs")
-        
-        errors = get_error_logs(5)
-        if errors:
-            error_df = pd.DataFrame(errors)
-            error_df['timestamp'] = pd.to_datetime(error_df['timestamp'])
-            
-            # Colorir por severidade
-            def color_severity(val):
-                if val == 'critical':
-                    return 'background-color: #ffe6e6'
-                elif val == 'high':
-                    return 'background-color: #fff3cd'
-                return ''
-            
-            styled_df = error_df.style.applymap(
-                color_severity, 
-                subset=['severity']
-            )
-            
-            st.dataframe(
-                styled_df,
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
-            st.info("Nenhum erro registrado nas últimas 24 horas")
-        
-        # Estatísticas Adicionais
-        st.subheader("📊 Statistics")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown("""
-                **Database Stats**
-                - Total Records: {:,}
-                - Today's Records: {:,}
-                - Active Queries: {}
-            """.format(
-                db_metrics.get('total_records', 0),
-                db_metrics.get('recent_records', 0),
-                db_metrics.get('active_connections', 0)
-            ))
-        
-        with col2:
-            st.markdown("""
-                **Cache Stats**
-                - Hit Rate: {:.1f}%
-                - Total Commands: {:,}
-                - Memory Used: {:.1f} MB
-            """.format(
-                redis_metrics.get('hit_rate', 0),
-                redis_metrics.get('total_commands', 0),
-                redis_metrics.get('used_memory_mb', 0)
-            ))
-        
-        with col3:
-            ingestion = workflow_metrics.get('ingestion', {})
-            st.markdown("""
-                **Ingestion Stats**
-                - Total: {}
-                - Success: {}
-                - Errors: {}
-            """.format(
-                ingestion.get('total', 0),
-                ingestion.get('success', 0),
-                ingestion.get('errors', 0)
-            ))
-        
-        with col4:
-            chat = workflow_metrics.get('chat', {})
-            st.markdown("""
-                **Chat Stats**
-                - Messages: {}
-                - Avg Time: {:.0f} ms
-                - Active Sessions: N/A
-            """.format(
-                chat.get('total', 0),
-                chat.get('avg_time', 0)
-            ))
+    else:
+        st.info("Nenhum erro registrado nas últimas 24 horas")
+
+    # Estatísticas Adicionais
+    pool_metrics = results['pools']
+
+    st.subheader("📊 Statistics")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown("""
+            **Database Stats**
+            - Total Records: {:,}
+            - Today's Records: {:,}
+            - Active Queries: {}
+            - Pool: {}/{} em uso ({} livres)
+        """.format(
+            tick.total_records,
+            tick.recent_records,
+            tick.active_connections,
+            _or_na(pool_metrics.get('pg_pool_used')),
+            _or_na(pool_metrics.get('pg_pool_max')),
+            _or_na(pool_metrics.get('pg_pool_idle'))
+        ))
+
+    with col2:
+        st.markdown("""
+            **Cache Stats**
+            - Hit Rate: {:.1f}%
+            - Total Commands: {:,}
+            - Memory Used: {:.1f} MB
+        """.format(
+            redis_metrics.get('hit_rate', 0),
+            redis_metrics.get('total_commands', 0),
+            redis_metrics.get('used_memory_mb', 0)
+        ))
+
+    with col3:
+        st.markdown("""
+            **Ingestion Stats**
+            - Total: {}
+            - Success: {}
+            - Errors: {}
+        """.format(
+            tick.ingestion_total,
+            tick.ingestion_success,
+            tick.ingestion_errors
+        ))
+
+    with col4:
+        st.markdown("""
+            **Chat Stats**
+            - Messages: {}
+            - Avg Time: {:.0f} ms
+            - Active Sessions: N/A
+        """.format(
+            tick.chat_total,
+            tick.chat_avg_time
+        ))
+
+if FRAGMENT_AVAILABLE:
+    # Só o bloco dinâmico é reexecutado a cada tick: CSS, título e sidebar
+    # ficam como estão e não são reenviados ao navegador
+    st.fragment(run_every=refresh_interval)(render_dashboard)()
+else:
+    if AUTOREFRESH_AVAILABLE:
+        # Rerun agendado pelo navegador: nenhuma thread do servidor fica presa
+        st_autorefresh(interval=refresh_interval * 1000, key='aide-refresh')
+    
+    render_dashboard()
     
-    # Aguardar antes do próximo refresh
-    time.sleep(refresh_interval)
\ No newline at end of file
+    # Sem nenhum dos dois, reagenda o rerun no próprio script
+    if not AUTOREFRESH_AVAILABLE:
+        time.sleep(refresh_interval)
+        st.rerun()
@@ -6,6 +6,12 @@ Simula exatamente como o n8n tenta conectar
 import psycopg2
 import sys
 
+try:
+    import docker
+    DOCKER_SDK_AVAILABLE = True
+except ImportError:
+    DOCKER_SDK_AVAILABLE = False
+
 def test_n8n_postgresql_connection():
     """Testa conexão exatamente como o n8n faria"""
     
@@ -86,22 +92,40 @@ def test_n8n_postgresql_connection():
         print(f"❌ Erro inesperado: {e}")
         return False
 
+def _docker_status(network):
+    """Containers rodando e existência da rede (SDK via socket ou CLI)"""
+    if DOCKER_SDK_AVAILABLE:
+        # Uma chamada HTTP ao /var/run/docker.sock por consulta, sem fork
+        client = docker.from_env()
+        names = {c.name for c in client.containers.list()}
+        try:
+            client.networks.get(network)
+            network_ok = True
+        except docker.errors.NotFound:
+            network_ok = False
+        return names, network_ok
+    
+    import subprocess
+    result = subprocess.run(
+        ["docker", "ps", "--format", "{{.Names}}"],
+        capture_output=True, text=True
+    )
+    names = set(result.stdout.strip().split('\n'))
+    result = subprocess.run(
+        ["docker", "network", "inspect", network],
+        capture_output=True, text=True
+    )
+    return names, result.returncode == 0
+
 def check_environment():
     """Verifica o ambiente Docker"""
-    import subprocess
-    
     print("\n🐳 Verificando ambiente Docker...")
     
     try:
-        # Verificar containers rodando
-        result = subprocess.run(
-            ["docker", "ps", "--format", "{{.Names}}"],
-            capture_output=True, text=True
-        )
-        
-        containers = result.stdout.strip().split('\n')
         required = ['aspi-postgres', 'aspi-n8n', 'aspi-redis']
+        containers, network_ok = _docker_status("aspi_aspi_network")
         
+        # Verificar containers rodando
         for container in required:
             if container in containers:
                 print(f"✅ {container}: Rodando")
@@ -109,12 +133,7 @@ def check_environment():
                 print(f"❌ {container}: Não encontrado")
                 
         # Verificar rede
-        result = subprocess.run(
-            ["docker", "network", "inspect", "aspi_aspi_network"],
-            capture_output=True, text=True
-        )
-        
-        if result.returncode == 0:
+        if network_ok:
             print("✅ Rede aspi_aspi_network: OK")
         else:
             print("❌ Rede aspi_aspi_network: Problema")
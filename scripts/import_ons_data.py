@@ -3,8 +3,13 @@
 Script para importar dados ONS das pastas locais para o PostgreSQL
 """
 
+import argparse
+import io
+import numpy as np
 import pandas as pd
 import psycopg2
+from psycopg2.extras import execute_values
+from joblib import Parallel, delayed
 from pathlib import Path
 import os
 import sys
@@ -23,6 +28,9 @@ DB_CONFIG = {
     'password': 'postgres'  # ajuste conforme necessário
 }
 
+# Linhas lidas do CSV por bloco (ajustável via --chunksize)
+DEFAULT_CHUNKSIZE = 100_000
+
 def connect_db():
     """Conecta ao PostgreSQL"""
     try:
@@ -32,75 +40,144 @@ def connect_db():
         logger.error(f"Erro ao conectar ao banco: {e}")
         return None
 
-def import_csv_to_db(csv_path, dataset_id, subsystem=None):
-    """Importa um CSV para a tabela data_records"""
+def _colunas_numericas(csv_path):
+    """Detecta as colunas numéricas de um CSV a partir de uma amostra"""
+    # Amostra pequena só para descobrir as colunas numéricas; cada arquivo
+    # tem a sua (colunas vazias no início de um arquivo não valem para outro)
+    amostra = pd.read_csv(csv_path, nrows=500)
+    return amostra.select_dtypes(include='number').columns.to_numpy()
+
+# Colunas gravadas em data_records, na ordem do COPY/INSERT
+RECORD_COLUMNS = ('dataset_id', 'period_start', 'subsystem', 'metric_name', 'value', 'unit', 'created_at')
+
+# Desligado na primeira recusa de COPY (ex.: Postgres gerenciado sem permissão)
+_copy_disponivel = True
+
+def _copy_chunk(cursor, chunk, numeric_cols, dataset_id, subsystem, now):
+    """Envia um bloco do CSV para data_records via COPY (ou INSERT em lote);
+    retorna nº de linhas"""
+    # Cada linha usa a primeira coluna numérica com valor preenchido
+    valores = chunk.to_numpy(dtype=float)
+    preenchidos = ~np.isnan(valores)
+    validas = preenchidos.any(axis=1)
+    primeira = preenchidos.argmax(axis=1)[validas]
+    
+    # Adaptar period_start baseado na estrutura do CSV
+    out = pd.DataFrame({
+        'dataset_id': dataset_id,
+        'period_start': now,
+        'subsystem': subsystem or 'BR',
+        'metric_name': numeric_cols[primeira],
+        'value': valores[validas][np.arange(len(primeira)), primeira],
+        'unit': 'Unidade',
+        'created_at': now
+    })
+    
+    global _copy_disponivel
+    if _copy_disponivel:
+        # Um único COPY por bloco em vez de um INSERT por linha; o savepoint
+        # preserva os blocos anteriores da transação se o COPY for negado
+        buf = io.StringIO()
+        out.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+        cursor.execute("SAVEPOINT copy_chunk")
+        try:
+            cursor.copy_expert(
+                "COPY data_records (%s) FROM STDIN WITH CSV" % ", ".join(RECORD_COLUMNS),
+                buf
+            )
+            cursor.execute("RELEASE SAVEPOINT copy_chunk")
+            return len(out)
+        except psycopg2.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT copy_chunk")
+            logger.warning(f"COPY indisponível ({e.pgcode}), usando INSERT em lote")
+            _copy_disponivel = False
+    
+    # Fallback: INSERT multi-VALUES em páginas de 1000 linhas
+    execute_values(
+        cursor,
+        "INSERT INTO data_records (%s) VALUES %%s" % ", ".join(RECORD_COLUMNS),
+        out.itertuples(index=False, name=None),
+        template="(%s, %s, %s, %s, %s, %s, %s)",
+        page_size=1000
+    )
+    return len(out)
+
+def import_csv_to_db(csv_path, dataset_id, subsystem=None, chunksize=DEFAULT_CHUNKSIZE, conn=None):
+    """Importa um CSV para a tabela data_records
+
+    Se ``conn`` for informada ela é reutilizada (e não é fechada aqui).
+    """
     try:
-        # Ler CSV
-        df = pd.read_csv(csv_path)
-        logger.info(f"Lendo {csv_path} - {len(df)} registros")
+        numeric_cols = _colunas_numericas(csv_path)
+        if len(numeric_cols) == 0:
+            logger.warning(f"Nenhuma coluna numérica em {csv_path}")
+            return False
         
-        # Conectar ao banco
-        conn = connect_db()
+        # Conectar ao banco (ou reutilizar a conexão do chamador)
+        propria = conn is None
+        if propria:
+            conn = connect_db()
         if not conn:
             return False
             
         cursor = conn.cursor()
+        now = datetime.now()
+        total = 0
         
-        # Preparar dados para inserção
-        for _, row in df.iterrows():
-            try:
-                # Adaptar baseado na estrutura do CSV
-                period_start = datetime.now()  # Você precisará ajustar isso baseado no CSV
-                
-                # Tentar encontrar colunas de valor
-                value = None
-                metric_name = "Valor"
-                unit = "Unidade"
-                
-                # Buscar primeira coluna numérica
-                for col in df.columns:
-                    if pd.api.types.is_numeric_dtype(df[col]) and not pd.isna(row[col]):
-                        value = float(row[col])
-                        metric_name = col
-                        break
-                
-                if value is None:
-                    continue
-                    
-                # Inserir na tabela
-                insert_query = """
-                    INSERT INTO data_records 
-                    (dataset_id, period_start, subsystem, metric_name, value, unit, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-                
-                cursor.execute(insert_query, (
-                    dataset_id,
-                    period_start,
-                    subsystem or 'BR',
-                    metric_name,
-                    value,
-                    unit,
-                    datetime.now()
-                ))
-                
-            except Exception as e:
-                logger.warning(f"Erro ao processar linha: {e}")
-                continue
-                
+        # Leitura em blocos (memória limitada); valores não numéricos que
+        # apareçam depois da amostra (ex.: "n/d") viram NaN em vez de abortar
+        leitor = pd.read_csv(
+            csv_path,
+            usecols=list(numeric_cols),
+            chunksize=chunksize
+        )
+        try:
+            for chunk in leitor:
+                # usecols não garante a ordem original das colunas
+                chunk = chunk[numeric_cols].apply(pd.to_numeric, errors='coerce')
+                total += _copy_chunk(cursor, chunk, numeric_cols, dataset_id, subsystem, now)
+        except Exception:
+            conn.rollback()
+            if propria:
+                conn.close()
+            raise
+        
+        # Uma única transação para todos os blocos
         conn.commit()
         cursor.close()
-        conn.close()
+        if propria:
+            conn.close()
         
-        logger.info(f"Importação de {csv_path} concluída")
+        logger.info(f"Importação de {csv_path} concluída - {total} registros")
         return True
         
     except Exception as e:
         logger.error(f"Erro ao importar {csv_path}: {e}")
         return False
 
+def _importar_lote(lote, chunksize):
+    """Worker: importa vários CSVs reutilizando uma única conexão"""
+    conn = connect_db()
+    if not conn:
+        return 0
+    try:
+        return sum(
+            import_csv_to_db(csv_file, dataset_id, chunksize=chunksize, conn=conn)
+            for csv_file, dataset_id in lote
+        )
+    finally:
+        conn.close()
+
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Importa CSVs do ONS para o PostgreSQL")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="linhas lidas por bloco de cada CSV")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="processos paralelos de importação")
+    args = parser.parse_args()
+    
     data_dir = Path(__file__).parent.parent / "data" / "dados_ons"
     
     # Mapear pastas para dataset_ids
@@ -111,14 +188,24 @@ def main():
         "curva-carga": "curva_carga"
     }
     
+    all_files = []
     for folder_name, dataset_id in folder_mapping.items():
         folder_path = data_dir / folder_name
         if folder_path.exists():
             logger.info(f"Processando pasta: {folder_path}")
-            
-            # Processar todos os CSVs na pasta
-            for csv_file in folder_path.glob("*.csv"):
-                import_csv_to_db(csv_file, dataset_id)
+            all_files.extend((csv_file, dataset_id) for csv_file in folder_path.glob("*.csv"))
+    
+    if not all_files:
+        logger.warning("Nenhum CSV encontrado para importar")
+        return
+    
+    # Lotes grossos (um por worker) para diluir o custo de despacho e de conexão
+    n_jobs = max(1, min(args.jobs, len(all_files)))
+    lotes = [all_files[i::n_jobs] for i in range(n_jobs)]
+    importados = Parallel(n_jobs=n_jobs, backend='loky')(
+        delayed(_importar_lote)(lote, args.chunksize) for lote in lotes
+    )
+    logger.info(f"{sum(importados)}/{len(all_files)} arquivos importados")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,162 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import time
 
-def test_chat_processing():
+try:
+    import orjson
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    _dumps = lambda obj: json.dumps(obj).encode()
+    _loads = json.loads
+
+# Sessão HTTP compartilhada (keep-alive) para as verificações síncronas
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Falhas transitórias (vale repetir); 4xx semânticos nunca são repetidos
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+class CircuitOpen(RuntimeError):
+    """Chamada recusada: o circuito do endpoint está aberto"""
+
+class CircuitBreaker:
+    """Disjuntor em memória (fechado -> aberto -> meio-aberto).
+    
+    Após `threshold` falhas consecutivas as chamadas seguintes falham na
+    hora, sem pagar o timeout; passados `reset_after` segundos uma chamada
+    de teste é liberada e, se der certo, o circuito fecha de novo."""
+    
+    def __init__(self, threshold=2, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+    
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+    
+    def before(self):
+        if self.state == "open":
+            raise CircuitOpen(f"circuito aberto após {self.failures} falhas")
+    
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+    
+    def failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+    
+    def call(self, fn, *args, **kwargs):
+        self.before()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.failure()
+            raise
+        self.success()
+        return result
+
+# Um disjuntor por host:porta, compartilhado entre check_services e os casos de chat
+BREAKERS = defaultdict(CircuitBreaker)
+
+def _breaker(url):
+    return BREAKERS[urlsplit(url).netloc]
+
+async def _post_with_retry(session, url, body, max_retries=3, base=0.2):
+    """POST (corpo JSON já serializado) com backoff exponencial e jitter
+    completo em falhas transitórias; devolve (status, corpo)"""
+    breaker = _breaker(url)
+    for attempt in range(max_retries + 1):
+        last = attempt == max_retries
+        breaker.before()
+        try:
+            async with session.post(
+                url,
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                breaker.success()
+                if response.status == 200:
+                    return response.status, _loads(await response.read())
+                if response.status not in RETRY_STATUS or last:
+                    return response.status, await response.text()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            breaker.failure()
+            if last:
+                raise
+        await asyncio.sleep(random.uniform(0, base * 2 ** attempt))
+
+async def _run_case(session, url, test_case):
+    """Executa um caso de teste; devolve (status, corpo, tempo em ms)"""
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    status, body = await _post_with_retry(session, url, test_case['_body'])
+    end_time = loop.time()
+    return status, body, (end_time - start_time) * 1000
+
+def _print_case(i, test_case, outcome):
+    """Mostra o resultado de um caso (ou a exceção que ele levantou)"""
+    print(f"\n🧪 Teste {i}: {test_case['name']}")
+    print("-" * 30)
+    
+    if isinstance(outcome, CircuitOpen):
+        print("❌ n8n indisponível - circuito aberto, teste não executado")
+        return
+    if isinstance(outcome, aiohttp.ClientConnectionError):
+        print("❌ Erro de conexão - Verifique se o n8n está rodando")
+        return
+    if isinstance(outcome, asyncio.TimeoutError):
+        print("❌ Timeout - O workflow pode estar inativo ou com erro")
+        return
+    if isinstance(outcome, Exception):
+        print(f"❌ Erro inesperado: {outcome}")
+        return
+    
+    status, result, elapsed_ms = outcome
+    
+    # Verificar resposta
+    if status == 200:
+        print(f"✅ Status: {status}")
+        print(f"⏱️  Tempo: {elapsed_ms:.0f}ms")
+        
+        if result.get('success'):
+            print(f"🎯 Intent: {result['response'].get('intent', 'N/A')}")
+            print(f"🔍 Confiança: {result['response'].get('confidence', 0)*100:.1f}%")
+            print(f"📝 Resposta: {result['response'].get('text', '')[:100]}...")
+            
+            if result['response'].get('visualization'):
+                print(f"📊 Visualização: {result['response']['visualization'].get('type', 'N/A')}")
+            
+            if result['response'].get('suggestions'):
+                print(f"💡 Sugestões: {len(result['response']['suggestions'])} disponíveis")
+                
+        else:
+            print(f"❌ Falha no processamento: {result}")
+            
+    else:
+        print(f"❌ Erro HTTP {status}")
+        print(f"📝 Resposta: {result[:200]}")
+
+async def run_chat_processing():
     """Testa o workflow chat-processing.json"""
     
     print("🚀 Testando ASPI Chat Processing Workflow")
@@ -47,52 +201,21 @@ def test_chat_processing():
         }
     ]
     
-    # Testar cada caso
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n🧪 Teste {i}: {test_case['name']}")
-        print("-" * 30)
-        
-        try:
-            # Fazer requisição
-            start_time = time.time()
-            response = requests.post(
-                url, 
-                json=test_case['payload'],
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
-            end_time = time.time()
-            
-            # Verificar resposta
-            if response.status_code == 200:
-                result = response.json()
-                print(f"✅ Status: {response.status_code}")
-                print(f"⏱️  Tempo: {(end_time - start_time)*1000:.0f}ms")
-                
-                if result.get('success'):
-                    print(f"🎯 Intent: {result['response'].get('intent', 'N/A')}")
-                    print(f"🔍 Confiança: {result['response'].get('confidence', 0)*100:.1f}%")
-                    print(f"📝 Resposta: {result['response'].get('text', '')[:100]}...")
-                    
-                    if result['response'].get('visualization'):
-                        print(f"📊 Visualização: {result['response']['visualization'].get('type', 'N/A')}")
-                    
-                    if result['response'].get('suggestions'):
-                        print(f"💡 Sugestões: {len(result['response']['suggestions'])} disponíveis")
-                        
-                else:
-                    print(f"❌ Falha no processamento: {result}")
-                    
-            else:
-                print(f"❌ Erro HTTP {response.status_code}")
-                print(f"📝 Resposta: {response.text[:200]}")
-                
-        except requests.exceptions.ConnectionError:
-            print("❌ Erro de conexão - Verifique se o n8n está rodando")
-        except requests.exceptions.Timeout:
-            print("❌ Timeout - O workflow pode estar inativo ou com erro")
-        except Exception as e:
-            print(f"❌ Erro inesperado: {e}")
+    # Serializar os payloads uma vez, fora do caminho das requisições
+    for tc in test_cases:
+        tc['_body'] = _dumps(tc['payload'])
+    
+    # Todos os casos em paralelo sobre uma sessão com keep-alive; a saída
+    # é impressa depois, na ordem dos casos
+    connector = aiohttp.TCPConnector(limit=10, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        outcomes = await asyncio.gather(
+            *(_run_case(session, url, tc) for tc in test_cases),
+            return_exceptions=True
+        )
+    
+    for i, (test_case, outcome) in enumerate(zip(test_cases, outcomes), 1):
+        _print_case(i, test_case, outcome)
     
     print("\n" + "=" * 50)
     print("📋 Checklist para Debug:")
@@ -115,11 +238,16 @@ def check_services():
     for service, endpoint in services:
         if service == "n8n":
             try:
-                response = requests.get(endpoint, timeout=5)
-                if response.status_code in [200, 401]:
+                # HEAD: só status, sem baixar o HTML da interface do n8n
+                response = _breaker(endpoint).call(
+                    SESSION.head, endpoint, timeout=2, allow_redirects=False
+                )
+                if response.status_code in (200, 302, 401, 404):
                     print(f"✅ {service}: Ativo")
                 else:
                     print(f"❌ {service}: Status {response.status_code}")
+            except CircuitOpen:
+                print(f"❌ {service}: Não acessível (circuito aberto)")
             except:
                 print(f"❌ {service}: Não acessível")
         else:
@@ -127,4 +255,4 @@ def check_services():
 
 if __name__ == "__main__":
     check_services()
-    test_chat_processing()
\ No newline at end of file
+    asyncio.run(run_chat_processing())
\ No newline at end of file
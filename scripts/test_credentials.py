@@ -3,141 +3,171 @@ Script para testar as credenciais antes de configurar no n8n
 Execute: python scripts/test_credentials.py
 """
 
+import asyncio
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-def test_postgresql():
+async def probe_postgresql(emit=print):
     """Testa conexão PostgreSQL"""
     try:
-        import psycopg2
-        conn = psycopg2.connect(
+        import asyncpg
+        conn = await asyncpg.connect(
             host="localhost", 
             port=5432, 
             database="aspi_db", 
             user="aspi", 
-            password="aspi123"
+            password="aspi123",
+            timeout=5,
+            command_timeout=5
         )
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1")
-        result = cursor.fetchone()
-        conn.close()
+        try:
+            result = await conn.fetchval("SELECT 1")
+        finally:
+            await conn.close()
         
-        if result[0] == 1:
-            print("✅ PostgreSQL: Conexão bem-sucedida")
+        if result == 1:
+            emit("✅ PostgreSQL: Conexão bem-sucedida")
             return True
         else:
-            print("❌ PostgreSQL: Resultado inesperado")
+            emit("❌ PostgreSQL: Resultado inesperado")
             return False
             
     except ImportError:
-        print("⚠️  PostgreSQL: psycopg2 não instalado")
-        print("   Instale com: pip install psycopg2-binary")
+        emit("⚠️  PostgreSQL: asyncpg não instalado")
+        emit("   Instale com: pip install asyncpg")
         return False
     except Exception as e:
-        print(f"❌ PostgreSQL: Erro de conexão - {e}")
-        print("   Verifique se o container está rodando: docker ps | grep postgres")
+        emit(f"❌ PostgreSQL: Erro de conexão - {e}")
+        emit("   Verifique se o container está rodando: docker ps | grep postgres")
         return False
 
-def test_redis():
+async def probe_redis(emit=print):
     """Testa conexão Redis"""
     try:
-        import redis
-        r = redis.Redis(
+        import redis.asyncio as aioredis
+        r = aioredis.Redis(
             host="localhost", 
             port=6379, 
             password="redis123", 
             db=0,
             socket_timeout=5
         )
-        response = r.ping()
-        
-        if response:
-            print("✅ Redis: Conexão bem-sucedida")
-            
-            # Teste adicional: set/get
-            r.set("test_key", "test_value")
-            value = r.get("test_key")
-            r.delete("test_key")
+        try:
+            response = await r.ping()
             
-            if value == b"test_value":
-                print("✅ Redis: Operações básicas funcionando")
-                return True
+            if response:
+                emit("✅ Redis: Conexão bem-sucedida")
+                
+                # Teste adicional: set/get num único round-trip
+                async with r.pipeline(transaction=False) as pipe:
+                    pipe.set("test_key", "test_value")
+                    pipe.get("test_key")
+                    pipe.delete("test_key")
+                    _, value, _ = await pipe.execute()
+                
+                if value == b"test_value":
+                    emit("✅ Redis: Operações básicas funcionando")
+                    return True
+                else:
+                    emit("❌ Redis: Problema com operações")
+                    return False
             else:
-                print("❌ Redis: Problema com operações")
+                emit("❌ Redis: Ping falhou")
                 return False
-        else:
-            print("❌ Redis: Ping falhou")
-            return False
+        finally:
+            await r.aclose()
             
     except ImportError:
-        print("⚠️  Redis: redis-py não instalado")
-        print("   Instale com: pip install redis")
+        emit("⚠️  Redis: redis-py não instalado")
+        emit("   Instale com: pip install redis")
         return False
     except Exception as e:
-        print(f"❌ Redis: Erro de conexão - {e}")
-        print("   Verifique se o container está rodando: docker ps | grep redis")
+        emit(f"❌ Redis: Erro de conexão - {e}")
+        emit("   Verifique se o container está rodando: docker ps | grep redis")
         return False
 
-def test_openai():
+async def probe_databases(pg_emit=print, redis_emit=print):
+    """PostgreSQL e Redis testados em paralelo (probes limitados por RTT)"""
+    return await asyncio.gather(probe_postgresql(pg_emit), probe_redis(redis_emit))
+
+def test_openai(emit=print):
     """Testa conexão OpenAI (requer chave válida)"""
     try:
         import openai
-        print("⚠️  OpenAI: Biblioteca encontrada")
-        print("   ⚡ Para testar completamente, você precisa:")
-        print("   1. Ter uma chave válida da OpenAI")
-        print("   2. Ter créditos disponíveis")
-        print("   3. Configurar a chave nas credenciais do n8n")
-        print("   📝 Teste manual: https://platform.openai.com/api-keys")
+        emit("⚠️  OpenAI: Biblioteca encontrada")
+        emit("   ⚡ Para testar completamente, você precisa:")
+        emit("   1. Ter uma chave válida da OpenAI")
+        emit("   2. Ter créditos disponíveis")
+        emit("   3. Configurar a chave nas credenciais do n8n")
+        emit("   📝 Teste manual: https://platform.openai.com/api-keys")
         return True
         
     except ImportError:
-        print("⚠️  OpenAI: openai não instalado")
-        print("   Instale com: pip install openai")
+        emit("⚠️  OpenAI: openai não instalado")
+        emit("   Instale com: pip install openai")
         return False
 
-def check_docker_containers():
+def check_docker_containers(emit=print):
     """Verifica se os containers Docker estão rodando"""
     import subprocess
     
-    print("\n🐳 Verificando containers Docker...")
+    emit("\n🐳 Verificando containers Docker...")
     
     try:
-        # Verificar se docker está disponível
+        # Um único docker inspect devolve nome e estado de cada container
+        containers = ["aspi-postgres", "aspi-redis", "aspi-n8n"]
         result = subprocess.run(
-            ["docker", "ps", "--format", "table {{.Names}}\t{{.Status}}"],
+            ["docker", "inspect", "--format", "{{.Name}},{{.State.Status}}", *containers],
             capture_output=True, text=True, timeout=10
         )
         
-        if result.returncode == 0:
-            output = result.stdout
-            containers = ["aspi-postgres", "aspi-redis", "aspi-n8n"]
+        # inspect sai com erro se algum container não existir, mas ainda
+        # imprime os encontrados; falha real é erro sem "No such object"
+        if result.returncode == 0 or result.stdout or "No such object" in result.stderr:
+            status = dict(
+                line.strip().lstrip('/').split(',', 1)
+                for line in result.stdout.splitlines() if ',' in line
+            )
             
             for container in containers:
-                if container in output and "Up" in output:
-                    print(f"✅ {container}: Rodando")
+                if status.get(container) == "running":
+                    emit(f"✅ {container}: Rodando")
                 else:
-                    print(f"❌ {container}: Não encontrado ou parado")
+                    emit(f"❌ {container}: Não encontrado ou parado")
         else:
-            print("❌ Docker: Comando falhou")
+            emit("❌ Docker: Comando falhou")
             
     except subprocess.TimeoutExpired:
-        print("❌ Docker: Timeout no comando")
+        emit("❌ Docker: Timeout no comando")
     except FileNotFoundError:
-        print("❌ Docker: Não encontrado no sistema")
+        emit("❌ Docker: Não encontrado no sistema")
+
+def run_probes():
+    """Docker, bancos e OpenAI verificados em paralelo; cada verificação
+    guarda suas linhas numa lista própria, impressas depois na ordem de sempre"""
+    docker, pg, redis, openai = [], [], [], []
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        docker_job = ex.submit(check_docker_containers, docker.append)
+        db_job = ex.submit(lambda: asyncio.run(probe_databases(pg.append, redis.append)))
+        openai_job = ex.submit(test_openai, openai.append)
+        docker_job.result()
+        postgres_ok, redis_ok = db_job.result()
+        openai_ok = openai_job.result()
+    
+    for line in docker:
+        print(line)
+    print("\n🧪 Testando conectividade...")
+    for line in pg + redis + openai:
+        print(line)
+    return postgres_ok, redis_ok, openai_ok
 
 def main():
     """Função principal"""
     print("🔐 ASPI - Teste de Credenciais para n8n")
     print("=" * 50)
     
-    # Verificar containers
-    check_docker_containers()
-    
-    print("\n🧪 Testando conectividade...")
-    
-    # Testar cada serviço
-    postgres_ok = test_postgresql()
-    redis_ok = test_redis()
-    openai_ok = test_openai()
+    # Verificar containers e testar cada serviço
+    postgres_ok, redis_ok, openai_ok = run_probes()
     
     print("\n" + "=" * 50)
     print("📊 Resumo dos Testes:")
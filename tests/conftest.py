@@ -0,0 +1,13 @@
+# tests/conftest.py
+"""
+Configuração compartilhada da suite de testes
+"""
+
+
+def pytest_configure(config):
+    """Registrar os marcadores customizados usados na suite."""
+    config.addinivalue_line("markers", "integration: testes que exigem n8n/Redis rodando")
+    config.addinivalue_line(
+        "markers",
+        "performance: testes com limites de tempo (pulados sem RUN_PERFORMANCE_TESTS=1)"
+    )